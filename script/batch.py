@@ -0,0 +1,189 @@
+from functools import partial
+from itertools import product
+from typing import Callable
+
+import numpy as np
+
+from script.check import *
+
+BatchRuleType = Callable[..., np.ndarray]
+BatchCheckerType = Callable[[np.ndarray, Board], np.ndarray]
+
+
+def count(values: np.ndarray, n: int) -> np.ndarray:
+    return (values == n).sum(0)
+
+
+def find(values: np.ndarray, n: int) -> np.ndarray:
+    return (values == n).argmax(0)
+
+
+def mark(shape: tuple[int, ...], *cells: tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    s = np.zeros(shape, bool)
+    positions = np.arange(shape[0]).reshape((-1,) + (1,) * (len(shape) - 1))
+    for position, condition in cells:
+        s |= condition & (positions == position)
+    return s
+
+
+def batch_duplicates(values: np.ndarray) -> np.ndarray:
+    bits = (np.int32(1) << values.astype(np.int32)) & ~1
+    seen = np.zeros(values.shape[1:], np.int32)
+    twice = np.zeros(values.shape[1:], np.int32)
+    for digit in bits:
+        twice |= seen & digit
+        seen |= digit
+    return (bits & twice) != 0
+
+
+def batch_consecutive(values: np.ndarray) -> np.ndarray:
+    a, b, c = values
+    s = (a != 0) & (b != 0) & (c != 0) & ((a + 1 == b) & (b == c - 1) | (a - 1 == b) & (b == c + 1))
+    return np.broadcast_to(s, values.shape)
+
+
+def batch_adjacent(values: np.ndarray) -> np.ndarray:
+    a, b = values
+    s = (a != 0) & (b != 0) & (abs(a - b) == 1)
+    return np.broadcast_to(s, values.shape)
+
+
+def batch_quadruple(values: np.ndarray) -> np.ndarray:
+    total = values.sum(0)
+    s = (values != 0).all(0) & ~((16 <= total) & (total < 25))
+    return np.broadcast_to(s, values.shape)
+
+
+def batch_link(values: np.ndarray, total: int = 10) -> np.ndarray:
+    a, b = values
+    s = (a != 0) & (b != 0) & (a + b != total) & (abs(a - b) != 1)
+    return np.broadcast_to(s, values.shape)
+
+
+def batch_tower(values: np.ndarray) -> np.ndarray:
+    s = (values[0] != 0) & (values[1:] > values[0]).any(0)
+    return mark(values.shape, (0, s))
+
+
+def batch_within(allowed: tuple[int, ...], values: np.ndarray) -> np.ndarray:
+    return mark(values.shape, (0, ~np.isin(values[0], allowed)))
+
+
+def batch_sd_line(values: np.ndarray, clue: list[str]) -> np.ndarray:
+    last = len(values)
+    one, nine = find(values, 1), find(values, last)
+    if clue[0].isdigit():
+        low, high = (int(clue[0]),) * 2
+    else:
+        distances = ro_ranges(last)[clue[0]]
+        low, high = distances[0], distances[-1]
+    distance = abs(one - nine) - 1
+    s = (count(values, 1) == 1) & (count(values, last) == 1) & ~((low <= distance) & (distance <= high))
+    return mark(values.shape, (one, s), (nine, s))
+
+
+def batch_fx_line(values: np.ndarray, clue: list[str]) -> np.ndarray:
+    digits = [int(j) for j in clue]
+    valid = np.all([count(values, d) <= 1 for d in digits], 0)
+    present = [(values == d).any(0) for d in digits]
+    indices = [find(values, d) for d in digits]
+    unsorted = np.zeros(values.shape[1:], bool)
+    for j in range(len(digits)):
+        for k in range(j + 1, len(digits)):
+            unsorted |= present[j] & present[k] & (indices[j] > indices[k])
+    s = valid & unsorted
+    return mark(values.shape, *((indices[j], s & present[j]) for j in range(len(digits))))
+
+
+def batch_as_line(values: np.ndarray) -> np.ndarray:
+    last = len(values)
+    one, nine = find(values, 1), find(values, last)
+    valid = (count(values, 1) == 1) & (count(values, last) == 1)
+    positions = np.arange(len(values)).reshape((-1,) + (1,) * (values.ndim - 1))
+    inside = (np.minimum(one, nine) <= positions) & (positions <= np.maximum(one, nine)) & (values != 0)
+    unsorted = np.zeros(values.shape[1:], bool)
+    for j in range(len(values)):
+        later = inside[j + 1:] & inside[j]
+        unsorted |= (later & (values[j + 1:] < values[j]) & (one < nine)).any(0)
+        unsorted |= (later & (values[j + 1:] > values[j]) & (one > nine)).any(0)
+    return inside & valid & unsorted
+
+
+def batch_qt_line(values: np.ndarray, clue: list[str]) -> np.ndarray:
+    a, b = map(int, clue)
+    at_a, at_b = values[a - 1], values[b - 1]
+    placed = (count(values, a) == 1) & (count(values, b) == 1) & (at_a != b) & (at_b != a)
+    swapped = (at_a != 0) & (at_b != 0) & ((at_a == b).astype(int) + (at_b == a) != 1)
+    return mark(values.shape,
+                (find(values, a), placed), (find(values, b), placed),
+                (a - 1, ~placed & ((at_a == a) | swapped)), (b - 1, ~placed & ((at_b == b) | swapped)))
+
+
+vectorized: dict[Callable, BatchRuleType] = {
+    duplicates: batch_duplicates,
+    consecutive: batch_consecutive,
+    adjacent: batch_adjacent,
+    quadruple: batch_quadruple,
+    link: batch_link,
+    tower: batch_tower,
+    within: batch_within,
+    sd_line: batch_sd_line,
+    fx_line: batch_fx_line,
+    as_line: batch_as_line,
+    qt_line: batch_qt_line
+}
+
+
+def batch_units(grids: np.ndarray, unit_list: list[Unit]) -> np.ndarray:
+    n, size = grids.shape[:2]
+    # Cell-major layout: every unit position becomes a contiguous row of n values
+    cells = np.ascontiguousarray(grids.reshape(n, size * size).T, np.int8)
+
+    groups: dict[tuple, tuple[RuleType, list[tuple[int, ...]]]] = {}
+    for unit, rule in unit_list:
+        if isinstance(rule, partial):
+            key = (rule.func, repr(rule.args), repr(rule.keywords), len(unit))
+        else:
+            key = (rule, "", "", len(unit))
+        groups.setdefault(key, (rule, []))[1].append(unit)
+
+    s = np.zeros((size * size, n), bool)
+    for rule, unit_indices in groups.values():
+        indices = np.array(unit_indices).T
+        if isinstance(rule, partial):
+            batch_rule = partial(vectorized[rule.func], *rule.args, **rule.keywords)
+        else:
+            batch_rule = vectorized[rule]
+        marks = batch_rule(cells[indices])
+        # Units of a group overlap, so scatter in layers that never hit the same cell twice
+        layers: list[tuple[list[int], list[tuple[int, int]]]] = []
+        for position in product(*map(range, indices.shape)):
+            i = indices[position]
+            layer = next((layer for layer in layers if i not in layer[0]), None)
+            if layer is None:
+                layers.append(layer := ([], []))
+            layer[0].append(i)
+            layer[1].append(position)
+        for targets, positions in layers:
+            s[targets] |= marks[tuple(zip(*positions))]
+    return np.ascontiguousarray(s.T).reshape(n, size, size)
+
+
+def batch_v_check(grids: np.ndarray, board: Board, disable: tuple[bool, ...]) -> np.ndarray:
+    return batch_units(grids, v_units(board, disable))
+
+
+def batch_check(grids: np.ndarray, board: Board, variant: str) -> np.ndarray:
+    return batch_units(grids, units[variant](board))
+
+
+def batch_errors(grids: np.ndarray, board: Board, variants: list[str]) -> np.ndarray:
+    unit_list = v_units(board, tuple(a in variants for a in ("??", "A?R", "??")))
+    for variant in variants:
+        unit_list += units[variant](board)
+    return batch_units(grids, unit_list)
+
+
+batch_checkers: dict[str, BatchCheckerType] = {
+    variant: partial(batch_check, variant=variant) for variant in checkers
+}
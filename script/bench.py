@@ -0,0 +1,170 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+from argparse import ArgumentParser
+from os import path
+from random import Random
+from timeit import Timer
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from script.check import *
+from script.level import read_level
+from script.main import first_frame_target
+from script.solver import Solver
+from script.validate import level_files
+
+window_sizes = ((800, 600), (1280, 720), (1920, 1080))
+
+
+def measure(func: Callable[[], object], repeat: int = 5) -> float:
+    timer = Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def random_grid(level: Board, rng: Random, fill: float) -> Board:
+    # A random valid grid of the level's size under its notes and clues, with some cells blanked
+    cells = level.geometry.cells
+    grid = Solver(Board([0] * cells, [""] * cells), []).solve(1, rng=rng)[0]
+    board = Board([n if rng.random() < fill else 0 for n in grid], level.notes)
+    board.top, board.left, board.between = level.top, level.left, level.between
+    return board
+
+
+def bench_checkers(files: list[str], rng: Random, repeat: int) -> dict[str, float]:
+    samples: dict[str, Board] = {}
+    for file in files:
+        level, variants = read_level(file)
+        for variant in variants:
+            samples.setdefault(variant, level)
+
+    results = {}
+    for variant in checkers:
+        level = samples.get(variant, Board([0] * 81, [""] * 81))
+        constraints = compile_units(level, [variant])
+        results[f"compile.{variant}"] = measure(partial(compile_units, level, [variant]), repeat)
+        for kind, fill in (("full", 1.0), ("partial", 0.5)):
+            board = random_grid(level, rng, fill)
+            results[f"check.{variant}.{kind}"] = measure(partial(constraints.check, board), repeat)
+    board = random_grid(Board([0] * 81, [""] * 81), rng, 0.5)
+    results["check.v_check.partial"] = measure(partial(v_check, board, (False, False, False)), repeat)
+    return results
+
+
+def bench_levels(files: list[str], repeat: int) -> dict[str, float]:
+    from script.file import get_level
+
+    results = {}
+    for file in files:
+        name = path.basename(file)[:-7]
+        results[f"parse.{name}"] = measure(partial(read_level, file), repeat)
+        results[f"load.{name}"] = measure(partial(get_level, file, pygame.sprite.Group()), repeat)
+    return results
+
+
+def bench_frames(files: list[str], repeat: int) -> dict[str, float]:
+    from script.state import state
+    from script.scene.play import Play
+
+    results = {}
+    for width, height in window_sizes:
+        screen = pygame.display.set_mode((width, height))
+        for file in files:
+            state.level = path.basename(file)[:-7]
+            play = Play(screen)
+
+            def frame(redraw: bool):
+                play.redraw = redraw
+                state.input.begin_frame()
+                play.run()
+                play.flip()
+
+            results[f"frame.{width}x{height}.{state.level}.full"] = measure(partial(frame, True), repeat)
+            results[f"frame.{width}x{height}.{state.level}.idle"] = measure(partial(frame, False), repeat)
+            play.close()
+    return results
+
+
+def bench_startup(repeat: int) -> dict[str, float]:
+    # Every run is a fresh interpreter, so nothing is imported or cached in memory yet; the fastest run is kept
+    reports = []
+    for _ in range(repeat):
+        process = subprocess.run([sys.executable, "-m", "script.main", "--startup"],
+                                 capture_output=True, text=True, check=True)
+        reports.append(json.loads(process.stdout.splitlines()[-1]))
+    return {f"startup.{mark.replace(' ', '_')}": min(report["marks"][mark] for report in reports)
+            for mark in reports[0]["marks"]}
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> list[str]:
+    regressions = []
+    for key, value in results.items():
+        if key not in baseline:
+            continue
+        ratio = value / baseline[key]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(f"{key:<48}{baseline[key] * 1e6:>12.1f}us{value * 1e6:>12.1f}us{ratio:>8.2f}x{flag}", file=sys.stderr)
+    return regressions
+
+
+def main(argv: list[str] = None) -> int:
+    parser = ArgumentParser(description="Benchmark checkers, level loading and frame rendering without a display.")
+    parser.add_argument("-o", "--output", default="-", help="JSON result file (default: stdout)")
+    parser.add_argument("-b", "--baseline", default=None, help="JSON result file to compare against")
+    parser.add_argument("-t", "--threshold", type=float, default=0.1, help="allowed slowdown ratio (default: 0.1)")
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-k", "--only", choices=("check", "load", "frame", "startup"), nargs="*", default=None)
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    pygame.display.set_mode(window_sizes[0])
+    # Text levels only, so result keys stay comparable when packs are added
+    files = [file for file in level_files("level/") if file.endswith(".sudoku")]
+    only = args.only or ("check", "load", "frame", "startup")
+    results = {}
+    if "check" in only:
+        results |= bench_checkers(files, Random(args.seed), args.repeat)
+    if "load" in only:
+        results |= bench_levels(files, args.repeat)
+    if "frame" in only:
+        results |= bench_frames(files[:3], args.repeat)
+    if "startup" in only:
+        results |= bench_startup(args.repeat)
+        if results["startup.first_frame"] > first_frame_target:
+            print(f"first frame after {results['startup.first_frame']:.3f}s, target {first_frame_target:.3f}s",
+                  file=sys.stderr)
+    pygame.quit()
+
+    report = {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "machine": platform.machine(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=1)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="UTF-8") as f:
+            f.write(text + "\n")
+
+    if args.baseline is None:
+        return 0
+    with open(args.baseline, encoding="UTF-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    print(f"{len(regressions)} regressions beyond {args.threshold:.0%}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
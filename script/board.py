@@ -0,0 +1,52 @@
+from math import isqrt
+
+from script.geometry import *
+
+SideClue = list[list[str]]
+BetweenClue = list[list[str]]
+
+
+class Board:
+    def __init__(self, numbers: list[int], notes: list[str]):
+        self.geometry = geometry(isqrt(len(numbers)))
+        n = self.size = self.geometry.size
+        self.values = bytearray(numbers)
+        self.bits = [0] * (n + 1)
+        for i, number in enumerate(self.values):
+            self.bits[number] |= 1 << i
+
+        self.notes = notes
+        self.note_masks: dict[str, int] = {}
+        for i, note in enumerate(notes):
+            if note:
+                self.note_masks[note] = self.note_masks.get(note, 0) | 1 << i
+
+        self.top: SideClue = [[] for _ in [0] * n]
+        self.left: SideClue = [[] for _ in [0] * n]
+        self.between: BetweenClue = [[""] * (n - 1) for _ in [0] * n]
+
+    def __getitem__(self, item: Point) -> int:
+        return self.values[item[1] * self.size + item[0]]
+
+    def __setitem__(self, item: Point, number: int):
+        i = item[1] * self.size + item[0]
+        self.bits[self.values[i]] ^= 1 << i
+        self.bits[number] |= 1 << i
+        self.values[i] = number
+
+    def note(self, pos: Point) -> str:
+        return self.notes[pos[1] * self.size + pos[0]]
+
+    def row_number(self, i: int, /) -> list[int]:
+        return list(self.values[i * self.size: (i + 1) * self.size])
+
+    def column_number(self, j: int, /) -> list[int]:
+        return list(self.values[j::self.size])
+
+    def duplicates(self, unit: int) -> int:
+        m = 0
+        for bits in self.bits[1:]:
+            bits &= unit
+            if bits & (bits - 1):
+                m |= bits
+        return m
@@ -0,0 +1,117 @@
+import json
+import struct
+from hashlib import blake2b
+from os import makedirs, path, replace, stat
+from typing import TypedDict
+
+from script.board import Board
+from script.level import read_level
+
+cache_directory = "cache/"
+magic = b"SDK\x02"
+header = struct.Struct("<4sqqHB")
+fields, clues = "\x1f", "\x1e"
+# Grades live next to the compiled levels, keyed by level content; see script.grade
+grade_file = path.join(cache_directory, "grade.json")
+
+
+class Grade(TypedDict):
+    difficulty: float
+    technique: str
+    steps: int
+    guesses: int
+    techniques: dict[str, int]
+
+
+def between_size(n: int) -> int:
+    return (n * (n - 1) + 7) // 8
+
+
+def pack_between(level: Board) -> bytes:
+    n = level.size
+    between = 0
+    for y in range(n):
+        for x in range(n - 1):
+            if level.between[y][x]:
+                between |= 1 << (y * (n - 1) + x)
+    return between.to_bytes(between_size(n), "little")
+
+
+def pack_text(level: Board, variants: list[str]) -> str:
+    return fields.join((
+        " ".join(variants),
+        clues.join(level.notes),
+        clues.join(" ".join(clue) for clue in level.left),
+        clues.join(" ".join(clue) for clue in level.top),
+    ))
+
+
+def unpack_board(values: bytes, between_data: bytes, text: str) -> tuple[Board, list[str]]:
+    variants, notes, left, top = text.split(fields)
+    level = Board(list(values), notes.split(clues))
+    n = level.size
+    if between := int.from_bytes(between_data, "little"):
+        level.between = [["-" if between >> (y * (n - 1) + x) & 1 else "" for x in range(n - 1)] for y in range(n)]
+    level.left = [clue.split() for clue in left.split(clues)]
+    level.top = [clue.split() for clue in top.split(clues)]
+    return level, variants.split()
+
+
+def pack_level(level: Board, variants: list[str], mtime: int = 0, size: int = 0) -> bytes:
+    text = pack_text(level, variants).encode("UTF-8")
+    return header.pack(magic, mtime, size, len(text), level.size) + bytes(level.values) + pack_between(level) + text
+
+
+def unpack_level(data: bytes) -> tuple[int, int, Board, list[str]]:
+    tag, mtime, size, length, n = header.unpack_from(data)
+    cells, text = header.size + n * n, header.size + n * n + between_size(n)
+    if tag != magic or len(data) != text + length:
+        raise ValueError("not a compiled level")
+    level, variants = unpack_board(data[header.size: cells], data[cells: text], data[text:].decode("UTF-8"))
+    return mtime, size, level, variants
+
+
+def cache_file(file: str, directory: str = cache_directory) -> str:
+    key = blake2b(path.abspath(file).encode("UTF-8"), digest_size=12).hexdigest()
+    return path.join(directory, f"{key}.level")
+
+
+def load_level(file: str, directory: str = cache_directory) -> tuple[Board, list[str]]:
+    source = stat(file)
+    compiled = cache_file(file, directory)
+    try:
+        with open(compiled, "rb") as f:
+            mtime, size, level, variants = unpack_level(f.read())
+        if (mtime, size) == (source.st_mtime_ns, source.st_size):
+            return level, variants
+    except (OSError, ValueError, struct.error, UnicodeDecodeError):
+        pass
+
+    level, variants = read_level(file)
+    try:
+        makedirs(directory, exist_ok=True)
+        with open(compiled + ".tmp", "wb") as f:
+            f.write(pack_level(level, variants, source.st_mtime_ns, source.st_size))
+        replace(compiled + ".tmp", compiled)
+    except OSError:
+        pass
+    return level, variants
+
+
+def content_key(level: Board, variants: list[str]) -> str:
+    return blake2b(pack_level(level, variants), digest_size=12).hexdigest()
+
+
+def load_grades(file: str = grade_file) -> dict[str, Grade]:
+    try:
+        with open(file, encoding="UTF-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_grades(grades: dict[str, Grade], file: str = grade_file):
+    makedirs(path.dirname(file), exist_ok=True)
+    with open(file + ".tmp", "w", encoding="UTF-8") as f:
+        json.dump(grades, f, separators=(",", ":"))
+    replace(file + ".tmp", file)
@@ -1,9 +1,8 @@
 from collections.abc import Iterable
 import pygame
+from script.geometry import symbols
 from script.state import state
-
-SideClue = list[list[str]]
-BetweenClue = list[list[str]]
+from script.text import text_cache
 
 
 class Cell(pygame.sprite.Sprite):
@@ -21,9 +20,19 @@ class Cell(pygame.sprite.Sprite):
         self.error = False
         self.corner_memo: set[int] = set()
         self.center_memo: set[int] = set()
+        self.key = ()
+        self.changed = True
 
     def update(self):
-        self.image = pygame.Surface((state.unit + 2, state.unit + 2))
+        key = (state.unit, state.left, state.top, self.number, self.fixed, self.selected, self.last_selected,
+               self.error, tuple(sorted(self.corner_memo)), tuple(sorted(self.center_memo)), self.note)
+        self.changed = key != self.key
+        if not self.changed:
+            return
+        self.key = key
+
+        if self.image.get_size() != (state.unit + 2, state.unit + 2):
+            self.image = pygame.Surface((state.unit + 2, state.unit + 2))
         self.image.fill((127, 0, 0) if self.error else (0, 0, 0))
         pos = (state.left + state.unit * self.x - 1, state.top + state.unit * self.y - 1)
         self.rect = self.image.get_rect(topleft=pos)
@@ -35,21 +44,21 @@ class Cell(pygame.sprite.Sprite):
 
         if self.number:
             color = (255, 255, 255) if self.fixed else (255, 255, 0)
-            text_image = state.number_font.render(str(self.number), True, color)
+            text_image = text_cache.get(str(self.number), state.unit * 2 // 3, color)
             text_rect = text_image.get_rect(center=(state.unit // 2 + 1, state.unit // 2 + 2))
             self.image.blit(text_image, text_rect)
         else:
-            center_text = "".join(map(str, sorted(self.center_memo)))
-            text_image = state.memo_font.render(center_text, True, (255, 255, 0))
+            center_text = "".join(symbols[n - 1] for n in sorted(self.center_memo))
+            text_image = text_cache.get(center_text, state.unit // 4, (255, 255, 0))
             text_rect = text_image.get_rect(center=(state.unit // 2 + 1, state.unit // 2 + 2))
             self.image.blit(text_image, text_rect)
-            corner_text = "".join(map(str, sorted(self.corner_memo)))
-            text_image = state.memo_font.render(corner_text, True, (255, 255, 0))
+            corner_text = "".join(symbols[n - 1] for n in sorted(self.corner_memo))
+            text_image = text_cache.get(corner_text, state.unit // 4, (255, 255, 0))
             text_rect = text_image.get_rect(topleft=(state.unit // 10, state.unit // 8))
             self.image.blit(text_image, text_rect)
 
         if self.note:
-            text_image = state.note_font.render(self.note, True, (255, 255, 255))
+            text_image = text_cache.get(self.note, state.unit // 3, (255, 255, 255))
             text_rect = text_image.get_rect(center=(state.unit // 6 * 5, state.unit // 5 * 4))
             self.image.blit(text_image, text_rect)
 
@@ -57,9 +66,6 @@ class Cell(pygame.sprite.Sprite):
 class GridType(Iterable[list[Cell]]):
     def __init__(self, grid: list[list[Cell]]):
         self.grid = grid
-        self.top: SideClue = [[] for _ in [0] * 9]
-        self.left: SideClue = [[] for _ in [0] * 9]
-        self.between: BetweenClue = [[""] * 8 for _ in [0] * 9]
         self.index = 0
 
     def __getitem__(self, item: tuple[int, int]) -> Cell:
@@ -74,9 +80,3 @@ class GridType(Iterable[list[Cell]]):
         row = self.grid[self.index]
         self.index += 1
         return row
-
-    def row_number(self, i: int, /) -> list[int]:
-        return [self.grid[i][j].number for j in range(9)]
-
-    def column_number(self, j: int, /) -> list[int]:
-        return [self.grid[i][j].number for i in range(9)]
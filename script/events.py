@@ -0,0 +1,106 @@
+import json
+from os import makedirs, path
+from time import perf_counter, strftime
+from typing import TextIO
+
+import pygame
+
+# One sampled frame: time, modifier keys, mouse position, mouse buttons, window size and the events
+Frame = tuple[float, int, tuple[int, int], tuple[bool, ...], tuple[int, int], list[pygame.event.Event]]
+
+
+def encode_event(event: pygame.event.Event) -> list:
+    # Window objects and the like cannot be stored and are never read by the scenes
+    attributes = {k: v for k, v in event.dict.items() if v is None or isinstance(v, (int, float, str, tuple, list))}
+    return [event.type, attributes]
+
+
+def decode_event(data: list) -> pygame.event.Event:
+    kind, attributes = data
+    return pygame.event.Event(kind, {k: tuple(v) if isinstance(v, list) else v for k, v in attributes.items()})
+
+
+class Input:
+    # Everything a scene reads from the user, sampled once at the start of every frame
+    def __init__(self):
+        self.time = 0.0
+        self.mods = 0
+        self.mouse = (0, 0)
+        self.buttons: tuple[bool, ...] = (False, False, False)
+        self.events: list[pygame.event.Event] = []
+
+    def begin_frame(self):
+        self.time = perf_counter()
+        self.mods = pygame.key.get_mods()
+        self.mouse = pygame.mouse.get_pos()
+        self.buttons = tuple(pygame.mouse.get_pressed())
+        self.events = pygame.event.get()
+
+    def start(self, level: str, snapshot: list[int], typecode: str):
+        pass
+
+    def stop(self, cells: list[int]):
+        pass
+
+
+class Recorder(Input):
+    # Writes every frame of a Play session as JSON Lines: a header, one line per frame and the final cells
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        self.file: TextIO | None = None
+        self.frames = 0
+
+    def start(self, level: str, snapshot: list[int], typecode: str):
+        makedirs(self.directory, exist_ok=True)
+        name = path.join(self.directory, f"{level}-{strftime('%Y%m%d-%H%M%S')}.jsonl")
+        self.file = open(name, "w", encoding="UTF-8")
+        self.frames = 0
+        header = {"level": level, "window": pygame.display.get_window_size(), "typecode": typecode,
+                  "snapshot": snapshot}
+        self.file.write(json.dumps(header, separators=(",", ":")) + "\n")
+
+    def begin_frame(self):
+        super().begin_frame()
+        if self.file is None:
+            return
+        frame = [self.time, self.mods, self.mouse, self.buttons, pygame.display.get_window_size(),
+                 [encode_event(event) for event in self.events]]
+        self.file.write(json.dumps(frame, separators=(",", ":")) + "\n")
+        self.frames += 1
+
+    def stop(self, cells: list[int]):
+        if self.file is None:
+            return
+        self.file.write(json.dumps({"frames": self.frames, "cells": cells}, separators=(",", ":")) + "\n")
+        self.file.close()
+        self.file = None
+
+
+class Replay(Input):
+    # Feeds a recording back frame by frame; the window follows the recorded size
+    def __init__(self, frames: list[list]):
+        super().__init__()
+        self.frames = frames
+        self.position = 0
+
+    @property
+    def done(self) -> bool:
+        return self.position >= len(self.frames)
+
+    def begin_frame(self):
+        time, self.mods, mouse, buttons, size, events = self.frames[self.position]
+        self.position += 1
+        self.time, self.mouse, self.buttons = time, tuple(mouse), tuple(buttons)
+        self.events = [decode_event(event) for event in events]
+        if tuple(size) != pygame.display.get_window_size():
+            pygame.display.set_mode(size, pygame.RESIZABLE)
+
+
+def read_recording(file: str) -> tuple[dict, list[list], dict | None]:
+    # The footer is missing when the session was cut short
+    with open(file, encoding="UTF-8") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    header, frames = lines[0], lines[1:]
+    footer = frames.pop() if frames and isinstance(frames[-1], dict) else None
+    return header, frames, footer
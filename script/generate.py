@@ -0,0 +1,219 @@
+import re
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from os import cpu_count, listdir, path
+from random import Random
+from time import perf_counter, time
+
+from script.check import *
+from script.level import format_level
+from script.solver import Solver
+
+clue_variants = {"SD", "FX", "QT", "RO", "LI", "CT", "LK", "BX", "VR"}
+exclusive = ({"SD", "FX", "QT"}, {"RO", "LI", "VR", "CT", "BX"})
+Option = tuple[int, str]
+# Puzzles are generated on the classic grid only
+classic = geometry(9)
+
+
+def check_variants(variants: list[str]):
+    if unknown := [v for v in variants if v not in checkers]:
+        raise ValueError(f"unknown variants: {' '.join(unknown)}")
+    if any(len(group.intersection(variants)) > 1 for group in exclusive):
+        raise ValueError(f"variants share the same clue slots: {' '.join(variants)}")
+
+
+class Generator:
+    def __init__(self, variants: list[str], rng: Random, deadline: float, check: float = 2.0):
+        check_variants(variants)
+        self.variants = variants
+        self.rng = rng
+        self.deadline = deadline
+        self.check = check
+
+        self.solution = b""
+        self.options: list[list[Option]] = []
+        self.level: list[int] = []
+        self.marks: dict[int, str] = {}
+        self.between: set[Point] = set()
+        self.left: list[list[str]] = [[] for _ in [0] * 9]
+        self.top: list[list[str]] = [[] for _ in [0] * 9]
+
+    def board(self) -> Board:
+        numbers, notes = [], []
+        for i in range(81):
+            number, note = self.options[i][self.level[i]]
+            numbers.append(number)
+            notes.append(self.marks.get(i, note))
+        board = Board(numbers, notes)
+        for x, y in self.between:
+            board.between[y][x] = "-"
+        board.left = [clue[:] for clue in self.left]
+        board.top = [clue[:] for clue in self.top]
+        return board
+
+    def unique(self, i: int = None) -> bool:
+        solver = Solver(self.board(), self.variants)
+        deadline = min(self.deadline, perf_counter() + self.check)
+        try:
+            if i is None:
+                return solver.count(2, deadline) == 1
+            # Starting from a unique puzzle, another solution has to differ where the clue was weakened
+            return not solver.solve(1, deadline, exclude=(i, self.solution[i]))
+        except TimeoutError:
+            if perf_counter() > self.deadline:
+                raise
+            # Too hard to settle within the check budget: keep the clue
+            return False
+
+    def full_grid(self) -> bytes | None:
+        solver = Solver(Board([0] * 81, [""] * 81), [v for v in self.variants if v not in clue_variants])
+        solutions = solver.solve(1, self.deadline, self.rng)
+        return solutions[0] if solutions else None
+
+    def derive(self):
+        s, rng = self.solution, self.rng
+        rows = [list(s[y * 9: y * 9 + 9]) for y in range(9)]
+        columns = [list(s[x::9]) for x in range(9)]
+
+        if "CT" in self.variants:
+            for i in range(81):
+                if all(s[j] < s[i] for j in classic.orthogonal[i]):
+                    self.marks[i] = "^"
+        if "BX" in self.variants:
+            for i in range(81):
+                square = [s[j] for j in classic.square[i]]
+                if len(set(square)) == len(square):
+                    self.marks[i] = "□"
+
+        groups: dict[int, str] = {}
+        if "VR" in self.variants:
+            for letter in "ABCD":
+                for n in range(1, 10):
+                    free = [i for i in range(81) if s[i] == n and i not in groups]
+                    groups[rng.choice(free)] = letter
+
+        for i, n in enumerate(s):
+            if "RO" in self.variants:
+                self.options.append([(n, ""), (0, "LMH"[(n - 1) // 3]), (0, "")])
+            elif "LI" in self.variants:
+                self.options.append([(0, chr(9311 + rng.choice([m for m in (n - 1, n + 1) if 1 <= m <= 9]))), (0, "")])
+            elif i in groups:
+                self.options.append([(n, ""), (0, groups[i]), (0, "")])
+            else:
+                self.options.append([(n, ""), (0, "")])
+        self.level = [0] * 81
+
+        if "LK" in self.variants:
+            for x, y in product(range(8), range(9)):
+                a, b = rows[y][x], rows[y][x + 1]
+                if (a + b == 10 or abs(a - b) == 1) and y * 9 + x not in self.marks:
+                    self.between.add((x, y))
+        for lines, side in ((rows, self.left), (columns, self.top)):
+            for i, line in enumerate(lines):
+                if "SD" in self.variants:
+                    side[i] = [str(abs(line.index(1) - line.index(9)) - 1)]
+                if "FX" in self.variants:
+                    side[i] = list(map(str, line[:rng.randint(2, 4)]))
+                if "QT" in self.variants:
+                    pairs = [(p, n) for p, n in enumerate(line, 1) if n != p and line[n - 1] not in (n, p)]
+                    if pairs:
+                        side[i] = list(map(str, rng.sample(rng.choice(pairs), 2)))
+
+    def reduce(self):
+        for i in self.rng.sample(range(81), 81):
+            while self.level[i] < len(self.options[i]) - 1:
+                self.level[i] += 1
+                if not self.unique(i):
+                    self.level[i] -= 1
+                    break
+
+        clues = [("mark", i) for i in self.marks] + [("between", pos) for pos in self.between]
+        clues += [(side, i) for side in ("left", "top") for i in range(9) if getattr(self, side)[i]]
+        for kind, key in self.rng.sample(clues, len(clues)):
+            if kind == "mark":
+                mark = self.marks.pop(key)
+                if not self.unique():
+                    self.marks[key] = mark
+            elif kind == "between":
+                self.between.remove(key)
+                if not self.unique():
+                    self.between.add(key)
+            else:
+                side = getattr(self, kind)
+                clue = side[key]
+                side[key] = []
+                if not self.unique():
+                    side[key] = clue
+
+    def run(self) -> Board | None:
+        try:
+            solution = self.full_grid()
+            if solution is None:
+                return None
+            self.solution = solution
+            self.derive()
+            if not self.unique():
+                return None
+            self.reduce()
+        except TimeoutError:
+            return None
+        return self.board()
+
+
+def attempt(variants: list[str], seed: int, deadline: float) -> str | None:
+    generator = Generator(variants, Random(seed), perf_counter() + deadline - time())
+    board = generator.run()
+    return None if board is None else format_level(board, variants)
+
+
+def next_number(directory: str) -> int:
+    numbers = [int(m.group(1)) for file in listdir(directory) if (m := re.match(r"(\d+)\.", file))]
+    return max(numbers, default=-1) + 1
+
+
+def main(argv: list[str] = None) -> int:
+    parser = ArgumentParser(description="Generate unique variant sudoku levels.")
+    parser.add_argument("variants", nargs="+", help="variant codes, e.g. DT TP")
+    parser.add_argument("-n", "--count", type=int, default=1, help="number of levels to write")
+    parser.add_argument("-t", "--time", type=float, default=300, help="total time budget in seconds")
+    parser.add_argument("-a", "--attempt", type=float, default=60, help="time budget of a single puzzle")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-o", "--output", default="level/")
+    parser.add_argument("-s", "--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    try:
+        check_variants(args.variants)
+    except ValueError as e:
+        parser.error(str(e))
+    jobs = args.jobs or cpu_count()
+    seeds = iter(range(Random(args.seed).getrandbits(32), 1 << 62))
+    end = time() + args.time
+    number = next_number(args.output)
+    name = "_".join(v.replace("?", "") for v in args.variants)
+    written = 0
+
+    executor = ProcessPoolExecutor(jobs)
+    pending = set()
+    while written < args.count and time() < end:
+        while len(pending) < jobs:
+            pending.add(executor.submit(attempt, args.variants, next(seeds), min(time() + args.attempt, end)))
+        done, pending = wait(pending, max(0.0, end - time()), FIRST_COMPLETED)
+        for future in done:
+            if (text := future.result()) is None or written >= args.count:
+                continue
+            file = path.join(args.output, f"{number:02}.{name}.sudoku")
+            with open(file, "w", encoding="UTF-8", newline="\r\n") as f:
+                f.write(text)
+            print(file, file=sys.stderr)
+            number += 1
+            written += 1
+    executor.shutdown(cancel_futures=True)
+    print(f"{written}/{args.count} levels written", file=sys.stderr)
+    return 0 if written == args.count else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+from collections.abc import Iterable
+from functools import cache
+from math import isqrt
+
+Point = tuple[int, int]
+Indices = tuple[int, ...]
+
+# Digits above 9 are written with letters in level files and pencil marks
+symbols = "123456789abcdefg"
+
+
+def box_shape(size: int) -> tuple[int, int]:
+    # Boxes are as square as the size allows, and wider than they are tall
+    height = max(d for d in range(1, isqrt(size) + 1) if size % d == 0)
+    return height, size // height
+
+
+def bits(indices: Indices) -> int:
+    m = 0
+    for i in indices:
+        m |= 1 << i
+    return m
+
+
+class Geometry:
+    # Every table holds flat indices: cell i is at positions[i] = (i % size, i // size)
+    def __init__(self, size: int):
+        n = self.size = size
+        self.cells = n * n
+        self.box = box_height, box_width = box_shape(n)
+        self.positions: tuple[Point, ...] = tuple((i % n, i // n) for i in range(n * n))
+
+        self.rows = tuple(tuple(y * n + x for x in range(n)) for y in range(n))
+        self.columns = tuple(tuple(y * n + x for y in range(n)) for x in range(n))
+        self.boxes = tuple(tuple((top + k // box_width) * n + left + k % box_width for k in range(n))
+                           for top in range(0, n, box_height) for left in range(0, n, box_width))
+        self.diagonals = (tuple(i * (n + 1) for i in range(n)), tuple((i + 1) * (n - 1) for i in range(n)))
+
+        self.orthogonal = self.around(((0, 1), (0, -1), (1, 0), (-1, 0)))
+        self.diagonal = self.around(((1, 1), (1, -1), (-1, 1), (-1, -1)))
+        self.king = self.around(((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)))
+        self.square = self.around(tuple((dx, dy) for dy in range(-1, 2) for dx in range(-1, 2)))
+
+        self.horizontal_pairs = self.translations(((0, 0), (1, 0)))
+        self.vertical_pairs = self.translations(((0, 0), (0, 1)))
+        self.diagonal_pairs = self.translations(((0, 0), (1, 1)), ((0, 1), (1, 0)))
+        self.windows = self.translations(((0, 0), (1, 0), (0, 1), (1, 1)))
+        self.triples = self.translations(((0, 0), (1, 0), (2, 0)), ((0, 0), (0, 1), (0, 2)),
+                                         ((0, 0), (1, 1), (2, 2)), ((2, 0), (1, 1), (0, 2)))
+
+        self.row_masks = list(map(bits, self.rows))
+        self.column_masks = list(map(bits, self.columns))
+        self.box_masks = list(map(bits, self.boxes))
+        self.diagonal_masks = list(map(bits, self.diagonals))
+
+    def inside(self, x: int, y: int) -> bool:
+        return 0 <= x < self.size and 0 <= y < self.size
+
+    def around(self, offsets: tuple[Point, ...]) -> tuple[Indices, ...]:
+        n = self.size
+        return tuple(tuple((y + dy) * n + x + dx for dx, dy in offsets if self.inside(x + dx, y + dy))
+                     for x, y in self.positions)
+
+    def translations(self, *shapes: tuple[Point, ...]) -> tuple[Indices, ...]:
+        n = self.size
+        return tuple(tuple((y + dy) * n + x + dx for dx, dy in shape) for shape in shapes for x, y in self.positions
+                     if all(self.inside(x + dx, y + dy) for dx, dy in shape))
+
+    def index(self, pos: Point) -> int:
+        return pos[1] * self.size + pos[0]
+
+    def mask(self, cells: Iterable[Point]) -> int:
+        m = 0
+        for x, y in cells:
+            m |= 1 << (y * self.size + x)
+        return m
+
+    def points(self, m: int) -> set[Point]:
+        s = set()
+        while m:
+            low = m & -m
+            s.add(self.positions[low.bit_length() - 1])
+            m ^= low
+        return s
+
+
+@cache
+def geometry(size: int) -> Geometry:
+    return Geometry(size)
@@ -0,0 +1,185 @@
+import json
+import sys
+from argparse import ArgumentParser
+from collections import Counter
+from itertools import combinations
+from multiprocessing import Pool
+from os import cpu_count
+
+from script.cache import Grade, content_key, grade_file, load_grades, save_grades
+from script.level import read_level
+from script.pack import open_level
+from script.solver import *
+from script.validate import level_files
+
+# Techniques from easy to hard with their weight. Variant codes stand for a single found only once that
+# variant's own deductions are applied on top of the classic candidates.
+techniques = {
+    "hidden single": 1.0, "naked single": 1.5,
+    "RO": 1.7, "LI": 1.7, "DT": 2.0, "CR": 2.0, "BX": 2.0, "VR": 2.0, "RM": 2.3, "CT": 2.3, "LK": 2.5,
+    "TP": 2.5, "QD": 2.8, "AS": 3.0, "SD": 3.2, "FX": 3.2, "QT": 3.2,
+    "pointing": 3.5, "naked pair": 4.0, "guess": 6.0,
+}
+
+
+class Layer:
+    # Deductions from one variant: digits its groups already hold and digits its rules would flag
+    def __init__(self, unit_list: list[Unit], cells: int):
+        self.peers: list[set[int]] = [set() for _ in range(cells)]
+        self.rules: list[list[tuple[Indices, RuleType]]] = [[] for _ in range(cells)]
+        for unit, rule in unit_list:
+            for i in unit:
+                if rule is duplicates:
+                    self.peers[i].update(j for j in unit if j != i)
+                else:
+                    self.rules[i].append((unit, rule))
+
+    def restrict(self, values: bytearray, i: int, c: int) -> int:
+        for j in self.peers[i]:
+            c &= ~(1 << values[j])
+        for unit, rule in self.rules[i]:
+            numbers = [values[j] for j in unit]
+            k = unit.index(i)
+            for n in digits(c):
+                numbers[k] = n
+                if k in rule(numbers):
+                    c ^= 1 << n
+        return c
+
+
+class Grader:
+    def __init__(self, board: Board, variants: list[str]):
+        self.cells = board.geometry.cells
+        self.all = every(board.size)
+        self.givens = bytes(board.values)
+        classic = v_units(board, tuple(a in variants for a in ("??", "A?R", "??")))
+        self.houses = [unit for unit, _ in classic]
+        self.classic = Layer(classic, self.cells)
+        self.layers = {code: Layer(units[code](board), self.cells)
+                       for code in sorted(variants, key=lambda code: techniques.get(code, 3.0))}
+        solutions = Solver(board, variants).solve(1)
+        if not solutions:
+            raise ValueError("no solution")
+        self.solution = solutions[0]
+
+    def single(self, values: bytearray, candidates: dict[int, int]) -> tuple[str, int, int] | None:
+        for house in self.houses:
+            once = twice = placed = 0
+            for i in house:
+                if values[i]:
+                    placed |= 1 << values[i]
+                else:
+                    twice |= once & candidates[i]
+                    once |= candidates[i]
+            if single := once & ~twice & ~placed:
+                n = single.bit_length() - 1
+                return "hidden single", next(i for i in house if not values[i] and candidates[i] >> n & 1), n
+        for i, c in candidates.items():
+            if c and not c & (c - 1):
+                return "naked single", i, c.bit_length() - 1
+        return None
+
+    def eliminate(self, values: bytearray, candidates: dict[int, int]) -> tuple[str, dict[int, int]] | None:
+        # Returns the eliminations of the first pointing group or naked pair that removes anything
+        peers = self.classic.peers
+        for house in self.houses:
+            for n in digits(self.all):
+                cells = [i for i in house if not values[i] and candidates[i] >> n & 1]
+                if len(cells) not in (2, 3):
+                    continue
+                seen = set.intersection(*(peers[i] for i in cells)) - set(cells)
+                if removed := {j: 1 << n for j in seen if not values[j] and candidates[j] >> n & 1}:
+                    return "pointing", removed
+        for house in self.houses:
+            pairs = [i for i in house if not values[i] and candidates[i].bit_count() == 2]
+            for a, b in combinations(pairs, 2):
+                if candidates[a] != candidates[b]:
+                    continue
+                seen = peers[a] & peers[b]
+                if removed := {j: candidates[a] for j in seen if not values[j] and candidates[j] & candidates[a]}:
+                    return "naked pair", removed
+        return None
+
+    def grade(self) -> Grade:
+        values = bytearray(self.givens)
+        eliminated = [0] * self.cells
+        used: Counter[str] = Counter()
+        while 0 in values:
+            empty = [i for i in range(self.cells) if not values[i]]
+            candidates = {i: self.classic.restrict(values, i, self.all) & ~eliminated[i] for i in empty}
+            step = self.single(values, candidates)
+            if step is None:
+                full = dict(candidates)
+                for code, layer in self.layers.items():
+                    restricted = {i: layer.restrict(values, i, c) for i, c in candidates.items()}
+                    if (step := self.single(values, restricted)) is not None:
+                        step = (code,) + step[1:]
+                        break
+                    for i, c in restricted.items():
+                        full[i] &= c
+            if step is None:
+                if (found := self.eliminate(values, full)) is not None:
+                    technique, removed = found
+                    for i, m in removed.items():
+                        eliminated[i] |= m
+                    used[technique] += 1
+                    continue
+                # Nothing left but trial and error: take the most constrained cell's digit from the solution
+                i = min(empty, key=lambda j: full[j].bit_count())
+                step = ("guess", i, self.solution[i])
+            technique, i, n = step
+            values[i] = n
+            used[technique] += 1
+        hardest = max(used, key=techniques.__getitem__, default="naked single")
+        return {"difficulty": round(techniques[hardest] + used["guess"], 1), "technique": hardest,
+                "steps": sum(used.values()), "guesses": used["guess"], "techniques": dict(used)}
+
+
+# Grades already in the cache, loaded once in every worker
+known: dict[str, Grade] = {}
+
+
+def load_known(file: str):
+    global known
+    known = load_grades(file)
+
+
+def grade_level(file: str) -> dict:
+    report = {"file": file}
+    try:
+        level, variants = open_level(file, read_level)
+        key = content_key(level, variants)
+        grade = known[key] if key in known else Grader(level, variants).grade()
+    except (OSError, ValueError, IndexError, KeyError) as e:
+        return report | {"error": repr(e)}
+    return report | {"key": key} | grade
+
+
+def main(argv: list[str] = None) -> int:
+    parser = ArgumentParser(description="Grade every level and puzzle pack in a directory by human techniques.")
+    parser.add_argument("directory", nargs="?", default="level/")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-o", "--output", default="-", help="JSON Lines report file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    files = level_files(args.directory)
+    grades = load_grades()
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="UTF-8")
+    jobs = args.jobs or cpu_count()
+    failed = 0
+    with Pool(jobs, load_known, (grade_file,)) as pool:
+        for report in pool.imap(grade_level, files, max(1, len(files) // (jobs * 16))):
+            if "error" in report:
+                failed += 1
+            else:
+                grades[report["key"]] = {k: report[k] for k in Grade.__annotations__}
+            output.write(json.dumps(report, ensure_ascii=False) + "\n")
+    if output is not sys.stdout:
+        output.close()
+    save_grades(grades)
+    print(f"{len(files) - failed}/{len(files)} graded", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
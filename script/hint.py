@@ -0,0 +1,133 @@
+from itertools import combinations
+from typing import TypedDict
+
+from script.solver import *
+
+
+class Hint(TypedDict):
+    kind: str
+    digits: list[int]
+    cells: list[Point]
+    place: Point | None
+    eliminate: list[Point]
+
+
+class HintEngine:
+    def __init__(self, board: Board, variants: list[str]):
+        solver = Solver(board, variants)
+        self.board = board
+        self.all, self.cells = solver.all, solver.cells
+        self.positions = board.geometry.positions
+        self.peers = solver.peers
+        self.houses = solver.houses
+        self.rules = solver.rules
+        self.cell_rules = solver.cell_rules
+        # Cells whose candidates depend on a cell's value: its peers and everything sharing a rule with it
+        self.neighbours = [set(self.peers[i]) | {j for r in self.cell_rules[i] for j in self.rules[r][0]} | {i}
+                           for i in range(self.cells)]
+
+        self.values = bytearray(self.cells)
+        self.candidates = [self.all] * self.cells
+        # Eliminations already shown as hints; they stay valid until a placed digit is taken back
+        self.eliminated = [0] * self.cells
+        self.dirty: set[Point] = set(self.positions)
+
+    def mark(self, pos: Point):
+        self.dirty.add(pos)
+
+    def update(self) -> dict[int, int]:
+        # Returns the previous candidates of every cell whose candidates changed
+        if not self.dirty:
+            return {}
+        values = self.board.values
+        touched = set()
+        for pos in self.dirty:
+            i = self.board.geometry.index(pos)
+            if self.values[i] and self.values[i] != values[i]:
+                self.eliminated = [0] * self.cells
+            self.values[i] = values[i]
+            touched |= self.neighbours[i]
+        self.dirty.clear()
+        changed = {}
+        for i in touched:
+            c = self.cell_candidates(i)
+            if c != self.candidates[i]:
+                changed[i] = self.candidates[i]
+                self.candidates[i] = c
+        return changed
+
+    def cell_candidates(self, i: int) -> int:
+        values = self.values
+        if values[i]:
+            return 1 << values[i]
+        c = self.all
+        for j in self.peers[i]:
+            c &= ~(1 << values[j])
+        for r in self.cell_rules[i]:
+            cells, rule = self.rules[r]
+            numbers = [values[j] for j in cells]
+            k = cells.index(i)
+            for n in digits(c):
+                numbers[k] = n
+                if k in rule(numbers):
+                    c ^= 1 << n
+        return c
+
+    def next_hint(self) -> Hint | None:
+        # Elimination hints are recorded as shown, so asking again moves on to the next step
+        self.update()
+        candidates = [c & ~e for c, e in zip(self.candidates, self.eliminated)]
+        empty = [i for i in range(self.cells) if not self.values[i]]
+        positions = self.positions
+
+        for i in empty:
+            if not candidates[i]:
+                return {"kind": "no candidates", "digits": [], "cells": [positions[i]], "place": None, "eliminate": []}
+        for i in empty:
+            c = candidates[i]
+            if not c & (c - 1):
+                return {"kind": "naked single", "digits": [c.bit_length() - 1], "cells": [positions[i]],
+                        "place": positions[i], "eliminate": []}
+
+        for house in self.houses:
+            for d in self.missing(house):
+                cells = [i for i in house if not self.values[i] and candidates[i] >> d & 1]
+                if len(cells) == 1:
+                    return {"kind": "hidden single", "digits": [d], "cells": [positions[i] for i in house],
+                            "place": positions[cells[0]], "eliminate": []}
+
+        for house in self.houses:
+            for d in self.missing(house):
+                cells = [i for i in house if not self.values[i] and candidates[i] >> d & 1]
+                if len(cells) not in (2, 3):
+                    continue
+                seen = set.intersection(*(set(self.peers[i]) for i in cells)) - set(cells)
+                kind = "pointing pair" if len(cells) == 2 else "pointing triple"
+                if hint := self.eliminate(candidates, seen, 1 << d, cells, kind):
+                    return hint
+
+        for house in self.houses:
+            pairs = [i for i in house if not self.values[i] and candidates[i].bit_count() == 2]
+            for a, b in combinations(pairs, 2):
+                if candidates[a] != candidates[b]:
+                    continue
+                seen = set(self.peers[a]) & set(self.peers[b])
+                if hint := self.eliminate(candidates, seen, candidates[a], [a, b], "naked pair"):
+                    return hint
+        return None
+
+    def missing(self, house: tuple[int, ...]) -> list[int]:
+        placed = 0
+        for i in house:
+            placed |= 1 << self.values[i]
+        return digits(self.all & ~placed)
+
+    def eliminate(self, candidates: list[int], seen: set[int], bits: int, cells: list[int],
+                  kind: str) -> Hint | None:
+        targets = [j for j in seen if not self.values[j] and candidates[j] & bits]
+        if not targets:
+            return None
+        for j in targets:
+            self.eliminated[j] |= bits
+        return {"kind": kind, "digits": digits(bits), "cells": [self.positions[i] for i in cells], "place": None,
+                "eliminate": sorted(self.positions[j] for j in targets)}
@@ -0,0 +1,111 @@
+from array import array
+from collections import deque
+from functools import cache
+from sys import getsizeof
+
+# A cell is one integer: its number in the low bits, then a bit per digit for center marks and for corner marks;
+# on a 9x9 grid that is bits 0-3, 4-12 and 13-21. An entry stores, per changed cell, its index in the low bits
+# and the XOR of its state before and after above them, so the same entry both undoes and redoes a move.
+
+
+class Layout:
+    def __init__(self, size: int):
+        self.size = size
+        self.center = size.bit_length()
+        self.corner = self.center + size
+        self.shift = (size * size - 1).bit_length()
+        # Entries stay in 32-bit words until a cell no longer fits, which only 16x16 needs
+        self.typecode = "I" if self.shift + self.corner + size <= 32 else "Q"
+        self.overhead = getsizeof(array(self.typecode))
+
+    def pack_memo(self, memo: set[int]) -> int:
+        m = 0
+        for n in memo:
+            m |= 1 << (n - 1)
+        return m
+
+    def unpack_memo(self, m: int) -> set[int]:
+        return {n for n in range(1, self.size + 1) if m >> (n - 1) & 1}
+
+    def pack(self, number: int, center: set[int], corner: set[int]) -> int:
+        return number | self.pack_memo(center) << self.center | self.pack_memo(corner) << self.corner
+
+    def number(self, cell: int) -> int:
+        return cell & (1 << self.center) - 1
+
+    def unpack(self, cell: int) -> tuple[int, set[int], set[int]]:
+        memo = (1 << self.size) - 1
+        return self.number(cell), self.unpack_memo(cell >> self.center & memo), self.unpack_memo(cell >> self.corner & memo)
+
+    def entry(self, xors: dict[int, int]) -> array:
+        return array(self.typecode, (i | d << self.shift for i, d in sorted(xors.items()) if d))
+
+    def delta(self, before: dict[int, int], after: dict[int, int]) -> array:
+        return self.entry({i: b ^ after[i] for i, b in before.items()})
+
+    def changes(self, entry: array) -> list[tuple[int, int]]:
+        low = (1 << self.shift) - 1
+        return [(d & low, d >> self.shift) for d in entry]
+
+    def entry_size(self, entry: array) -> int:
+        return self.overhead + entry.itemsize * len(entry)
+
+
+@cache
+def layout(size: int) -> Layout:
+    return Layout(size)
+
+
+class History:
+    def __init__(self, limit: int = 1 << 20, cell_layout: Layout = None):
+        self.limit = limit
+        self.layout = cell_layout or layout(9)
+        self.entries: deque[array] = deque()
+        self.undone: list[array] = []
+        self.size = 0
+
+    def load(self, entries: list[array], undone: list[array]):
+        self.entries = deque(entries)
+        self.undone = undone
+        self.size = sum(map(self.layout.entry_size, entries + undone))
+
+    def push(self, entry: array):
+        if not entry:
+            return
+        self.entries.append(entry)
+        self.size += self.layout.entry_size(entry)
+        for undone in self.undone:
+            self.size -= self.layout.entry_size(undone)
+        self.undone.clear()
+        while self.size > self.limit and self.entries:
+            self.checkpoint()
+
+    def checkpoint(self):
+        # Merge the two oldest moves; past the cap, early history is kept at a coarser grain
+        first = self.entries.popleft()
+        self.size -= self.layout.entry_size(first)
+        if not self.entries:
+            return
+        second = self.entries.popleft()
+        self.size -= self.layout.entry_size(second)
+        merged: dict[int, int] = {}
+        for i, d in self.layout.changes(first) + self.layout.changes(second):
+            merged[i] = merged.get(i, 0) ^ d
+        entry = self.layout.entry(merged)
+        if entry:
+            self.entries.appendleft(entry)
+            self.size += self.layout.entry_size(entry)
+
+    def undo(self) -> array | None:
+        if not self.entries:
+            return None
+        entry = self.entries.pop()
+        self.undone.append(entry)
+        return entry
+
+    def redo(self) -> array | None:
+        if not self.undone:
+            return None
+        entry = self.undone.pop()
+        self.entries.append(entry)
+        return entry
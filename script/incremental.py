@@ -0,0 +1,52 @@
+from collections import Counter, defaultdict
+
+from script.check import *
+
+
+class IncrementalChecker:
+    def __init__(self, board: Board, variants: list[str]):
+        self.board = board
+        self.units: list[Unit] = v_units(board, tuple(a in variants for a in ("??", "A?R", "??")))
+        for variant in variants:
+            self.units += units[variant](board)
+        self.positions = board.geometry.positions
+
+        self.cell_units: dict[Point, list[int]] = defaultdict(list)
+        for i, (cells, _) in enumerate(self.units):
+            for j in cells:
+                self.cell_units[self.positions[j]].append(i)
+
+        self.unit_errors: list[set[Point]] = [set() for _ in self.units]
+        self.error_count: Counter[Point] = Counter()
+        self.errors: set[Point] = set()
+        self.dirty: set[Point] = set(self.cell_units)
+
+    def mark(self, pos: Point):
+        self.dirty.add(pos)
+
+    def update(self) -> set[Point]:
+        if not self.dirty:
+            return set()
+        touched = {i for pos in self.dirty for i in self.cell_units.get(pos, ())}
+        self.dirty.clear()
+
+        changed = set()
+        values = self.board.values
+        for i in touched:
+            cells, rule = self.units[i]
+            errors = {self.positions[cells[k]] for k in rule([values[j] for j in cells])}
+            if errors == self.unit_errors[i]:
+                continue
+            for pos in self.unit_errors[i] - errors:
+                self.error_count[pos] -= 1
+                if not self.error_count[pos]:
+                    del self.error_count[pos]
+                    self.errors.discard(pos)
+                    changed.add(pos)
+            for pos in errors - self.unit_errors[i]:
+                if not self.error_count[pos]:
+                    self.errors.add(pos)
+                    changed.add(pos)
+                self.error_count[pos] += 1
+            self.unit_errors[i] = errors
+        return changed
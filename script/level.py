@@ -0,0 +1,90 @@
+from script.board import Board
+from script.geometry import geometry, symbols
+
+
+def clue_value(token: str) -> str:
+    # Digits above 9 take one character in a clue row, written as in the grid
+    return str(symbols.index(token) + 1) if len(token) == 1 and token in symbols[9:] else token
+
+
+def clue_symbol(token: str) -> str:
+    return symbols[int(token) - 1] if token.isdecimal() and int(token) > 9 else token
+
+
+def parse_level(data: str) -> tuple[Board, list[str]]:
+    v, *b = data.strip().splitlines()
+    variants: list[str] = v.split()
+    borders = [k for k, line in enumerate(b) if line.startswith("+")]
+    rows = [line for line in b[:borders[-1]] if line.startswith("|")]
+    size = len(rows)
+    box_width = geometry(size).box[1]
+    # Every box is "| " and two characters per cell: the cell itself and a mark after it
+    offsets = [x // box_width * (2 + 2 * box_width) + 2 + x % box_width * 2 for x in range(size)]
+    side = size // box_width * (2 + 2 * box_width) + 2
+
+    numbers: list[int] = []
+    notes: list[str] = []
+    for row in rows:
+        for x in offsets:
+            cell, additional = row[x], row[x + 1]
+            if cell in symbols and "LI" not in variants:
+                numbers.append(symbols.index(cell) + 1)
+                notes.append("")
+            else:
+                numbers.append(0)
+                notes.append(chr(9312 + symbols.index(cell)) if cell in symbols else "" if cell == "•" else cell)
+            if additional in "^□":
+                notes[-1] = additional
+    level = Board(numbers, notes)
+
+    for y, row in enumerate(rows):
+        for x, offset in enumerate(offsets[:-1]):
+            if row[offset + 1] == "-":
+                level.between[y][x] = "-"
+        level.left[y] = list(map(clue_value, row[side:].split()))
+    for row in b[borders[-1] + 1:]:
+        for x, offset in enumerate(offsets):
+            if offset < len(row) and row[offset] != " ":
+                level.top[x].append(clue_value(row[offset]))
+
+    return level, variants
+
+
+def read_level(file: str) -> tuple[Board, list[str]]:
+    with open(file, 'r', encoding="UTF-8") as f:
+        return parse_level(f.read())
+
+
+def format_row(cells: list[str], box_width: int = 3) -> str:
+    row = ""
+    for x, cell in enumerate(cells):
+        if x % box_width == 0:
+            row += "| "
+        row += cell
+    return row + "|"
+
+
+def format_level(level: Board, variants: list[str]) -> str:
+    n = level.size
+    box_height, box_width = level.geometry.box
+    border = ("+ " + "― " * box_width) * (n // box_width) + "+" + " ―" * max(map(len, level.left))
+    lines = [" ".join(variants), border]
+    for y in range(n):
+        cells = []
+        for x in range(n):
+            number, note = level[x, y], level.note((x, y))
+            additional = "-" if x < n - 1 and level.between[y][x] == "-" else " "
+            symbol = symbols[number - 1] if number else "•"
+            if note in ("^", "□"):
+                cells.append(symbol + note)
+            elif note:
+                cells.append((symbols[ord(note) - 9312] if "LI" in variants else note) + additional)
+            else:
+                cells.append(symbol + additional)
+        lines.append(" ".join([format_row(cells, box_width)] + list(map(clue_symbol, level.left[y]))))
+        if y % box_height == box_height - 1:
+            lines.append(border)
+    for k in range(max(map(len, level.top))):
+        lines.append(format_row([(clue_symbol(clue[k]) if k < len(clue) else " ") + " " for clue in level.top],
+                                box_width))
+    return "\n".join(lines) + "\n"
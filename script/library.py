@@ -0,0 +1,172 @@
+import gc
+import json
+from os import makedirs, path, replace, scandir
+from time import perf_counter
+from typing import Iterator, TypedDict
+
+from script.cache import Grade, cache_directory, content_key, load_grades
+from script.level import read_level
+from script.pack import get_pack, open_level
+
+index_file = path.join(cache_directory, "index.json")
+
+
+class LevelEntry(TypedDict):
+    name: str
+    mtime: int
+    size: int
+    variants: list[str]
+    givens: int
+    difficulty: float | None
+    solved: float | None
+    key: str
+
+
+fields = tuple(LevelEntry.__annotations__)
+sort_keys = {
+    "name": lambda entry: entry["name"],
+    "variants": lambda entry: (entry["variants"], entry["name"]),
+    "givens": lambda entry: (entry["givens"], entry["name"]),
+    "difficulty": lambda entry: (entry["difficulty"] is None, entry["difficulty"] or 0, entry["name"]),
+}
+
+
+def level_file(name: str, directory: str = "level/") -> str:
+    # Levels from a pack are named after it, with the puzzle's index: "name#index"
+    pack, _, index = name.rpartition("#")
+    if pack and index.isdecimal():
+        return path.join(directory, f"{pack}.pack#{index}")
+    return path.join(directory, f"{name}.sudoku")
+
+
+class Library:
+    def __init__(self, directory: str = "level/", file: str = index_file):
+        self.directory = directory
+        self.file = file
+        self.levels: dict[str, LevelEntry] = {}
+        self.scanning: Iterator | None = None
+        self.found: set[str] = set()
+        self.pending: list[tuple[str, str, int, int]] = []
+        self.changed = False
+        self.version = 0
+        self.grades: dict[str, Grade] = {}
+        self.load()
+
+    def load(self):
+        # Collection passes over tens of thousands of fresh rows would double the load time
+        gc.disable()
+        try:
+            with open(self.file, encoding="UTF-8") as f:
+                data = json.load(f)
+            if data.get("directory") == path.abspath(self.directory):
+                # Rows are stored as lists to keep the index small
+                self.levels = {row[0]: dict(zip(fields, row)) for row in data["levels"] if len(row) == len(fields)}
+        except (OSError, ValueError):
+            pass
+        finally:
+            gc.enable()
+
+    def save(self):
+        if not self.changed:
+            return
+        data = {"directory": path.abspath(self.directory),
+                "levels": [[entry[k] for k in fields] for entry in self.levels.values()]}
+        try:
+            makedirs(path.dirname(self.file), exist_ok=True)
+            with open(self.file + ".tmp", "w", encoding="UTF-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            replace(self.file + ".tmp", self.file)
+        except OSError:
+            return
+        self.changed = False
+
+    def scan(self):
+        self.scanning = scandir(self.directory)
+        self.found = set()
+        self.pending.clear()
+        # Grades come from `python -m script.grade`, matched to levels by content
+        self.grades = load_grades()
+        for entry in self.levels.values():
+            if (grade := self.grades.get(entry["key"])) and grade["difficulty"] != entry["difficulty"]:
+                entry["difficulty"] = grade["difficulty"]
+                self.changed = True
+                self.version += 1
+
+    def stat(self, end: float | None):
+        for item in self.scanning:
+            if item.name.endswith(".sudoku") and item.is_file():
+                self.found_file(item.name[:-7], item.path, item.stat())
+            elif item.name.endswith(".pack") and item.is_file():
+                # Only the header is read here; every puzzle is then indexed like a file of its own
+                try:
+                    count = len(get_pack(item.path))
+                except (OSError, ValueError):
+                    continue
+                source = item.stat()
+                for i in range(count):
+                    self.found_file(f"{item.name[:-5]}#{i}", f"{item.path}#{i}", source)
+            if end is not None and perf_counter() > end:
+                return
+        self.scanning = None
+        for name in self.levels.keys() - self.found:
+            del self.levels[name]
+            self.changed = True
+            self.version += 1
+
+    def found_file(self, name: str, file: str, stat):
+        self.found.add(name)
+        entry = self.levels.get(name)
+        if entry is None or (entry["mtime"], entry["size"]) != (stat.st_mtime_ns, stat.st_size):
+            self.pending.append((name, file, stat.st_mtime_ns, stat.st_size))
+
+    @property
+    def busy(self) -> bool:
+        return self.scanning is not None or bool(self.pending)
+
+    def update(self, budget: float = None) -> bool:
+        # Stat and parse changed files until the time budget runs out, None for all of them
+        end = None if budget is None else perf_counter() + budget
+        if self.scanning is not None:
+            self.stat(end)
+        while self.pending and (end is None or perf_counter() < end):
+            name, file, mtime, size = self.pending.pop()
+            try:
+                level, variants = open_level(file, read_level)
+            except (OSError, ValueError, IndexError, KeyError):
+                continue
+            key = content_key(level, variants)
+            self.levels[name] = {
+                "name": name, "mtime": mtime, "size": size, "variants": variants,
+                "givens": level.geometry.cells - level.bits[0].bit_count(),
+                "difficulty": self.grades[key]["difficulty"] if key in self.grades else None,
+                "solved": self.levels[name]["solved"] if name in self.levels else None,
+                "key": key,
+            }
+            self.changed = True
+            self.version += 1
+        if not self.busy:
+            self.save()
+        return self.busy
+
+    def query(self, variants: list[str] = (), key: str = "name") -> list[str]:
+        entries = [entry for entry in self.levels.values() if all(v in entry["variants"] for v in variants)]
+        entries.sort(key=sort_keys[key])
+        return [entry["name"] for entry in entries]
+
+    def mark_solved(self, name: str, time: float):
+        if (entry := self.levels.get(name)) is None:
+            return
+        if entry["solved"] is None or time < entry["solved"]:
+            entry["solved"] = round(time, 1)
+            self.changed = True
+            self.save()
+
+
+library: Library | None = None
+
+
+def get_library() -> Library:
+    global library
+    if library is None:
+        library = Library()
+    return library
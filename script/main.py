@@ -1,25 +1,90 @@
-import pygame
-
-from script.scene import Scene, End
-from script.scene.select import Select
-from script.state import state
-
-pygame.init()
-screen = pygame.display.set_mode((800, 600), pygame.RESIZABLE)
-clock = pygame.time.Clock()
-
-scene: Scene = Select(screen)
-
-while True:
-    screen.fill((0, 0, 0))
-
-    result = scene.run()
-    if result is not None:
-        if result is End:
-            pygame.quit()
-            break
-        scene = result(screen)
-    else:
-        pygame.display.update()
-
-    clock.tick(state.fps)
+from time import perf_counter
+
+# Taken before pygame is imported, which is most of the time to the first frame
+started = perf_counter()
+
+import json
+import sys
+from argparse import ArgumentParser
+
+import pygame
+
+from script.events import Recorder
+from script.scene import Scene, End
+from script.scene.select import Select
+from script.state import state
+from script.warmup import warmup
+
+# Seconds from the start of this module to the first frame on screen
+first_frame_target = 0.5
+
+
+def idle(timeout: int | None):
+    event = pygame.event.wait() if timeout is None else pygame.event.wait(timeout)
+    if event.type != pygame.NOEVENT:
+        for e in [event] + pygame.event.get():
+            pygame.event.post(e)
+
+
+def startup_report(marks: dict[str, float]) -> dict:
+    first_frame = marks["first frame"]
+    return {"pygame": pygame.version.ver, "marks": marks, "first_frame": first_frame,
+            "target": first_frame_target, "met": first_frame <= first_frame_target}
+
+
+def main(argv: list[str] = None) -> int:
+    parser = ArgumentParser(description="Play sudoku variants.")
+    parser.add_argument("--record", metavar="DIRECTORY", default=None,
+                        help="record every Play session for python -m script.replay")
+    parser.add_argument("--startup", action="store_true",
+                        help="print a JSON startup timing report after the first frame and quit")
+    args = parser.parse_args(argv)
+    if args.record is not None:
+        state.input = Recorder(args.record)
+
+    # Each mark is the time since startup at which that step finished
+    marks = {"import": perf_counter() - started}
+    # Only the modules the game uses; sound and joysticks are never initialized
+    pygame.display.init()
+    pygame.font.init()
+    marks["init"] = perf_counter() - started
+    screen = pygame.display.set_mode((800, 600), pygame.RESIZABLE)
+    clock = pygame.time.Clock()
+    marks["window"] = perf_counter() - started
+
+    scene: Scene = Select(screen)
+    marks["select"] = perf_counter() - started
+
+    while True:
+        if not scene.partial:
+            screen.fill((0, 0, 0))
+
+        state.input.begin_frame()
+        result = scene.run()
+        if result is not None:
+            if result is End:
+                if state.profiler:
+                    state.profiler.close()
+                pygame.quit()
+                return 0
+            scene = result(screen)
+        else:
+            scene.flip()
+
+        if "first frame" not in marks:
+            marks["first frame"] = perf_counter() - started
+            if args.startup:
+                print(json.dumps(startup_report(marks)))
+                pygame.quit()
+                return 0
+            # Fonts, Play and the listed levels load in the background while the list is already usable
+            warmup.start()
+
+        clock.tick(state.fps)
+        if (timeout := scene.timeout()) != 0:
+            idle(timeout)
+
+
+# Worker processes started with spawn re-import this module; only the launched one opens a window
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+import struct
+import sys
+from argparse import ArgumentParser
+from mmap import ACCESS_READ, mmap
+from os import fstat, listdir, makedirs, path, replace, stat
+from shutil import copyfileobj
+from tempfile import TemporaryFile
+from typing import Callable, Iterable, Iterator
+
+from script.board import Board
+from script.cache import between_size, fields, load_level, pack_between, pack_text, unpack_board
+from script.level import format_level, read_level
+
+# A pack is a header, one fixed-width record per puzzle and then the variable-length text of every puzzle.
+# A record holds the digits, the between marks and where the puzzle's text starts and how long it is.
+magic = b"SDP\x01"
+header = struct.Struct("<4sBI")
+Entry = tuple[str, Board, list[str]]
+
+
+def record_struct(size: int) -> struct.Struct:
+    return struct.Struct(f"<{size * size}s{between_size(size)}sQI")
+
+
+class Pack:
+    def __init__(self, file: str):
+        # The map keeps its own handle, so the file itself can be closed right away
+        with open(file, "rb") as f:
+            source = fstat(f.fileno())
+            self.data = mmap(f.fileno(), 0, access=ACCESS_READ)
+        self.key = (source.st_mtime_ns, source.st_size)
+        tag, self.size, self.count = header.unpack_from(self.data) if len(self.data) >= header.size else (b"", 9, 0)
+        self.record = record_struct(self.size)
+        self.text = header.size + self.count * self.record.size
+        if tag != magic or len(self.data) < self.text:
+            self.close()
+            raise ValueError(f"not a puzzle pack: {file}")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def entry(self, i: int) -> Entry:
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        values, between, offset, length = self.record.unpack_from(self.data, header.size + i * self.record.size)
+        start = self.text + offset
+        name, text = self.data[start: start + length].decode("UTF-8").split(fields, 1)
+        return name, *unpack_board(values, between, text)
+
+    def __getitem__(self, i: int) -> tuple[Board, list[str]]:
+        _, level, variants = self.entry(i)
+        return level, variants
+
+    def __iter__(self) -> Iterator[Entry]:
+        # Records are read in file order, so bulk passes only touch each page once
+        for i in range(self.count):
+            yield self.entry(i)
+
+    def close(self):
+        self.data.close()
+
+    def __enter__(self) -> "Pack":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def write_pack(file: str, entries: Iterable[Entry]) -> int:
+    # Streams the puzzles: records go straight to the file, their text is spooled and appended at the end
+    count = offset = 0
+    size = 9
+    record: struct.Struct | None = None
+    with open(file + ".tmp", "wb") as f, TemporaryFile() as text:
+        f.write(header.pack(magic, size, 0))
+        for name, level, variants in entries:
+            if record is None:
+                size, record = level.size, record_struct(level.size)
+            elif level.size != size:
+                raise ValueError(f"{name}: a pack holds one board size, {size}x{size}")
+            data = fields.join((name, pack_text(level, variants))).encode("UTF-8")
+            f.write(record.pack(bytes(level.values), pack_between(level), offset, len(data)))
+            text.write(data)
+            offset += len(data)
+            count += 1
+        text.seek(0)
+        copyfileobj(text, f)
+        f.seek(0)
+        f.write(header.pack(magic, size, count))
+    replace(file + ".tmp", file)
+    return count
+
+
+packs: dict[str, Pack] = {}
+
+
+def get_pack(file: str) -> Pack:
+    # Packs stay mapped between lookups and are reopened when the file changes
+    source = stat(file)
+    pack = packs.get(file)
+    if pack is None or pack.key != (source.st_mtime_ns, source.st_size):
+        if pack is not None:
+            pack.close()
+        pack = packs[file] = Pack(file)
+    return pack
+
+
+def split_entry(file: str) -> tuple[str, int] | None:
+    # Puzzles inside a pack are addressed as "file.pack#index"
+    pack_file, _, index = file.rpartition("#")
+    if pack_file.endswith(".pack") and index.isdecimal():
+        return pack_file, int(index)
+    return None
+
+
+def open_level(file: str, loader: Callable[[str], tuple[Board, list[str]]] = load_level) -> tuple[Board, list[str]]:
+    if (entry := split_entry(file)) is None:
+        return loader(file)
+    pack_file, index = entry
+    return get_pack(pack_file)[index]
+
+
+def text_entries(directory: str) -> Iterator[Entry]:
+    for file in sorted(f for f in listdir(directory) if f.endswith(".sudoku")):
+        yield file[:-7], *read_level(path.join(directory, file))
+
+
+def main(argv: list[str] = None) -> int:
+    parser = ArgumentParser(description="Convert between .sudoku level files and a puzzle pack.")
+    parser.add_argument("mode", choices=("build", "extract"))
+    parser.add_argument("source", help="level directory to build from, or pack to extract")
+    parser.add_argument("target", help="pack to write, or directory to extract into")
+    args = parser.parse_args(argv)
+
+    if args.mode == "build":
+        count = write_pack(args.target, text_entries(args.source))
+    else:
+        makedirs(args.target, exist_ok=True)
+        count = 0
+        with Pack(args.source) as pack:
+            for i, (name, level, variants) in enumerate(pack):
+                with open(path.join(args.target, f"{name or i}.sudoku"), "w", encoding="UTF-8") as f:
+                    f.write(format_level(level, variants))
+                count += 1
+    print(f"{count} levels", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+import csv
+import json
+from collections import deque
+from heapq import nlargest
+from time import perf_counter
+from typing import TextIO
+
+phases = ("event", "check", "timer", "cells", "grid", "clues", "overlay", "display")
+
+
+class FrameProfiler:
+    def __init__(self, window: int = 120, output: str = ""):
+        self.window: deque[tuple[float, dict[str, float]]] = deque(maxlen=window)
+        self.frame = 0
+        self.begin = self.last = 0.0
+        self.times: dict[str, float] = {}
+
+        self.file: TextIO | None = None
+        self.writer = None
+        if output:
+            self.file = open(output, "w", encoding="UTF-8", newline="")
+            if output.endswith(".csv"):
+                self.writer = csv.writer(self.file)
+                self.writer.writerow(("frame", "total") + phases)
+
+    def start(self):
+        self.begin = self.last = perf_counter()
+        self.times = {}
+
+    def lap(self, phase: str):
+        now = perf_counter()
+        self.times[phase] = self.times.get(phase, 0) + now - self.last
+        self.last = now
+
+    def end(self):
+        total = self.last - self.begin
+        self.window.append((total, self.times))
+        self.frame += 1
+        if self.writer is not None:
+            self.writer.writerow([self.frame, f"{total:.6f}"] + [f"{self.times.get(p, 0):.6f}" for p in phases])
+        elif self.file is not None:
+            self.file.write(json.dumps({"frame": self.frame, "total": round(total, 6)}
+                                       | {p: round(t, 6) for p, t in self.times.items()}) + "\n")
+
+    def lines(self, worst: int = 3) -> list[str]:
+        if not self.window:
+            return []
+        n = len(self.window)
+        total = sum(t for t, _ in self.window) / n
+        result = [f"frame {total * 1000:6.2f}ms"]
+        for phase in phases:
+            mean = sum(times.get(phase, 0) for _, times in self.window) / n
+            result.append(f"{phase:<7}{mean * 1000:6.2f}  {mean / total if total else 0:4.0%}")
+        result.append(f"worst of {n}")
+        for t, times in nlargest(worst, self.window, key=lambda frame: frame[0]):
+            result.append(f"{t * 1000:6.2f}ms {max(times, key=times.get, default='')}")
+        return result
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = self.writer = None
@@ -0,0 +1,89 @@
+import json
+import os
+import sys
+from argparse import ArgumentParser
+from array import array
+from statistics import fmean, quantiles
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from script.events import Replay, read_recording
+from script.session import journal_file, write_snapshot
+from script.state import state
+
+
+def replay(file: str, frames: bool = False) -> dict:
+    # Runs a recorded Play session as fast as it goes, from a private journal and library
+    from script import library
+    from script.scene.play import Play
+
+    header, recorded, footer = read_recording(file)
+    report = {"file": file, "level": header["level"]}
+    saved = state.input, state.session_directory, library.library
+    with TemporaryDirectory() as directory:
+        state.level = header["level"]
+        state.session_directory = directory
+        state.input = source = Replay(recorded)
+        library.library = library.Library(file=os.path.join(directory, "index.json"))
+        write_snapshot(journal_file(state.level, directory), array(header["typecode"], header["snapshot"]))
+        screen = pygame.display.set_mode(header["window"], pygame.RESIZABLE)
+
+        play = Play(screen)
+        times = []
+        ended = False
+        begin = perf_counter()
+        while not ended and not source.done:
+            start = perf_counter()
+            if not play.partial:
+                screen.fill((0, 0, 0))
+            source.begin_frame()
+            ended = play.run() is not None
+            if not ended:
+                play.flip()
+            times.append(perf_counter() - start)
+        total = perf_counter() - begin
+        # A session that leaves Play has already closed its journal and watchdog
+        if not ended:
+            play.journal.close(play.elapsed())
+            play.watchdog.close()
+        state.input, state.session_directory, library.library = saved
+
+    report |= {"frames": len(times), "total": total, "mean": fmean(times) if times else 0.0,
+               "max": max(times, default=0.0)}
+    if len(times) >= 2:
+        percentiles = quantiles(times, n=100)
+        report["p50"], report["p95"] = percentiles[49], percentiles[94]
+    report["match"] = footer is not None and play.cells() == footer["cells"]
+    if frames:
+        report["times"] = times
+    return report
+
+
+def main(argv: list[str] = None) -> int:
+    parser = ArgumentParser(description="Replay recorded Play sessions without a display and time every frame.")
+    parser.add_argument("files", nargs="+", help="recordings made with python -m script.main --record")
+    parser.add_argument("-o", "--output", default="-", help="JSON Lines report file (default: stdout)")
+    parser.add_argument("-f", "--frames", action="store_true", help="include every frame time in the report")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="UTF-8")
+    mismatched = 0
+    for file in args.files:
+        report = replay(file, args.frames)
+        mismatched += not report["match"]
+        output.write(json.dumps(report) + "\n")
+        print(f"{file}: {report['frames']} frames in {report['total']:.3f}s, "
+              f"{'final grid matches' if report['match'] else 'FINAL GRID DIFFERS'}", file=sys.stderr)
+    if output is not sys.stdout:
+        output.close()
+    pygame.quit()
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
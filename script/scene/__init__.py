@@ -2,21 +2,39 @@ from typing import Optional, Type
 
 import pygame
 
+from script.state import state
+
 callback = Type["Scene"]
 
 
 class Scene:
+    partial = False
+
     def __init__(self, screen: pygame.Surface):
         self.screen = screen
+        self.redraw = True
+        self.dirty: list[pygame.Rect] = []
 
     def get_event(self) -> Optional[callback]:
-        for event in pygame.event.get():
+        for event in state.input.events:
             if event.type == pygame.QUIT:
                 return End
 
     def run(self) -> Optional[callback]:
         return self.get_event()
 
+    def timeout(self) -> Optional[int]:
+        # Milliseconds until the scene needs another frame without input, None to wait for input
+        return 0 if self.redraw else None
+
+    def flip(self):
+        if self.partial and not self.redraw:
+            pygame.display.update(self.dirty)
+        else:
+            pygame.display.update()
+        self.redraw = False
+        self.dirty.clear()
+
 
 class End(Scene):
     pass
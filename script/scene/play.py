@@ -1,262 +1,498 @@
-from time import perf_counter
-from typing import TypedDict
-
-from script.scene import *
-from script.cell import *
-from script.check import *
-from script.text import TextRender
-from script.state import state
-from script.file import get_level
-
-corner_keys = (pygame.K_LSHIFT, pygame.K_RSHIFT, pygame.K_LCTRL, pygame.K_RCTRL)
-center_keys = (pygame.K_LALT, pygame.K_RALT)
-keymap = {pygame.K_LEFT: (-1, 0), pygame.K_RIGHT: (1, 0), pygame.K_UP: (0, -1), pygame.K_DOWN: (0, 1)}
-
-
-class SingleHistory(TypedDict):
-    pos: tuple[int, int]
-    before: tuple[int, set[int], set[int]]
-    after: tuple[int, set[int], set[int]] | None
-
-
-HistoryType = list[SingleHistory]
-
-
-class Play(Scene):
-    def __init__(self, screen: pygame.Surface):
-        from script.scene.select import Select
-
-        super().__init__(screen)
-        self.render = TextRender(screen, state.unit, (255, 255, 255))
-        self.select_scene = Select
-
-        self.cell_group = pygame.sprite.Group()
-        self.grid, self.variants = get_level(f"level/{state.level}.sudoku", self.cell_group)
-        self.selection: set[Point] = set()
-        self.last_selection = (-1, -1)
-        self.history: list[HistoryType] = []
-        self.undo_history: list[HistoryType] = []
-
-        self.click_time = 0
-        self.begin_time = perf_counter()
-        self.clear_time = -1
-
-    def get_event(self) -> Optional[callback]:
-        keys = pygame.key.get_pressed()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return End
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if not (pos := self.get_cell()):
-                    self.selection.clear()
-                    self.last_selection = (-1, -1)
-                    continue
-                if not any(keys[k] for k in center_keys + corner_keys):
-                    self.selection.clear()
-                    if not self.click_time:
-                        self.click_time = 30
-                self.selection.add(pos)
-                double_click = pos == self.last_selection
-                self.last_selection = pos
-                if not 0 < self.click_time < 30 or not double_click:
-                    continue
-                number = self.grid[pos].number
-                if not number:
-                    continue
-                for p in product(range(9), repeat=2):  # type: tuple[int, int]
-                    if self.grid[p].number == number:
-                        self.selection.add(p)
-            if event.type != pygame.KEYDOWN:
-                continue
-            if event.key == pygame.K_BACKSPACE:
-                history = self.erase()
-                if any(data["before"] != data["after"] for data in history):
-                    self.history.append(history)
-                    self.undo_history.clear()
-            if event.key == pygame.K_z:
-                self.undo()
-            if event.key == pygame.K_x:
-                self.redo()
-            if pygame.K_1 <= event.key <= pygame.K_9 or pygame.K_KP1 <= event.key <= pygame.K_KP9:
-                key = 0
-                if pygame.K_1 <= event.key <= pygame.K_9:
-                    key = event.key - pygame.K_0
-                if pygame.K_KP1 <= event.key <= pygame.K_KP9:
-                    key = event.key - pygame.K_KP_1 + 1
-                history = self.write(key)
-                if any(data["before"] != data["after"] for data in history):
-                    self.history.append(history)
-                    self.undo_history.clear()
-            if event.key in keymap:
-                dx, dy = keymap[event.key]
-                nx, ny = self.last_selection
-                nx += dx
-                ny += dy
-                if not (0 <= nx < 9 and 0 <= ny < 9):
-                    continue
-                if not any(keys[k] for k in center_keys + corner_keys):
-                    self.selection.clear()
-                self.selection.add((nx, ny))
-                self.last_selection = (nx, ny)
-            if event.key == pygame.K_ESCAPE:
-                return self.select_scene
-
-    def write(self, key: int) -> HistoryType:
-        keys = pygame.key.get_pressed()
-        selection = {pos for pos in self.selection if not self.grid[pos].fixed}
-        history: HistoryType = []
-        for pos in selection:
-            cell = self.grid[pos]
-            history.append({
-                "pos": pos,
-                "before": (cell.number, cell.center_memo.copy(), cell.corner_memo.copy()),
-                "after": None
-            })
-        memo_selection = {pos for pos in self.selection if not self.grid[pos].number}
-        if any(keys[k] for k in center_keys):
-            if all(key in self.grid[pos].center_memo for pos in memo_selection):
-                for pos in memo_selection:
-                    self.grid[pos].center_memo.remove(key)
-            else:
-                for pos in memo_selection:
-                    self.grid[pos].center_memo.add(key)
-        elif any(keys[k] for k in corner_keys):
-            if all(key in self.grid[pos].corner_memo for pos in memo_selection):
-                for pos in memo_selection:
-                    self.grid[pos].corner_memo.remove(key)
-            else:
-                for pos in memo_selection:
-                    self.grid[pos].corner_memo.add(key)
-        else:
-            value = 0 if all(self.grid[pos].number == key for pos in selection) else key
-            for pos in selection:
-                self.grid[pos].number = value
-        for data in history:
-            cell = self.grid[data['pos']]
-            data["after"] = (cell.number, cell.center_memo.copy(), cell.corner_memo.copy())
-        return history
-
-    def erase(self) -> HistoryType:
-        selection = {pos for pos in self.selection if not self.grid[pos].fixed}
-        history: HistoryType = []
-        for pos in selection:
-            cell = self.grid[pos]
-            history.append({
-                "pos": pos,
-                "before": (cell.number, cell.center_memo.copy(), cell.corner_memo.copy()),
-                "after": None
-            })
-        if all(self.grid[pos].number for pos in selection):
-            for pos in selection:
-                self.grid[pos].number = 0
-        elif any(self.grid[pos].corner_memo | self.grid[pos].center_memo for pos in selection):
-            for pos in selection:
-                self.grid[pos].corner_memo.clear()
-                self.grid[pos].center_memo.clear()
-        else:
-            for pos in selection:
-                self.grid[pos].number = 0
-        for data in history:
-            cell = self.grid[data['pos']]
-            data["after"] = (cell.number, cell.center_memo.copy(), cell.corner_memo.copy())
-        return history
-
-    def undo(self):
-        if not self.history:
-            return
-        history = self.history.pop()
-        for data in history:
-            cell = self.grid[data['pos']]
-            cell.number = data["before"][0]
-            cell.center_memo = data["before"][1]
-            cell.corner_memo = data["before"][2]
-        self.undo_history.append(history)
-
-    def redo(self):
-        if not self.undo_history:
-            return
-        history = self.undo_history.pop()
-        for data in history:
-            cell = self.grid[data['pos']]
-            cell.number = data["after"][0]
-            cell.center_memo = data["after"][1]
-            cell.corner_memo = data["after"][2]
-        self.history.append(history)
-
-    @staticmethod
-    def get_cell() -> Optional[Point]:
-        mx, my = pygame.mouse.get_pos()
-        x, y = (mx - state.left) // state.unit, (my - state.top) // state.unit
-        if not (0 <= x < 9 and 0 <= y < 9):
-            return
-        return x, y
-
-    def run(self) -> Optional[callback]:
-        result = self.get_event()
-        if result is not None:
-            return result
-
-        self.click_time = max(0, self.click_time - 1)
-
-        if any(pygame.mouse.get_pressed()):
-            if pos := self.get_cell():
-                self.selection.add(pos)
-                self.last_selection = pos
-
-        for pos in product(range(9), repeat=2):  # type: tuple[int, int]
-            self.grid[pos].selected = pos in self.selection
-            self.grid[pos].last_selected = pos == self.last_selection
-
-        errors = v_check(self.grid, tuple(a in self.variants for a in ("??", "A?R", "??")))
-        for variant in self.variants:
-            errors |= checkers[variant](self.grid)
-        for pos in product(range(9), repeat=2):  # type: tuple[int, int]
-            self.grid[pos].error = pos in errors
-
-        if all(self.grid[pos].number for pos in product(range(9), repeat=2)) and not errors:
-            if self.clear_time < 0:
-                self.clear_time = perf_counter() - self.begin_time
-            self.screen.fill((48, 48, 48))
-
-        time = self.clear_time if self.clear_time > 0 else perf_counter() - self.begin_time
-        pos = (state.unit // 2, state.height - state.unit // 2)
-        self.render(f"{time:05.1f}", pos, size=state.unit * 2 // 3, anchor="bottomleft")
-
-        state.number_font = pygame.font.Font("resource/font/D2Coding.ttf", state.unit * 2 // 3)
-        state.note_font = pygame.font.Font("resource/font/D2Coding.ttf", state.unit // 3)
-        state.memo_font = pygame.font.Font("resource/font/D2Coding.ttf", state.unit // 4)
-        state.side_font = pygame.font.Font("resource/font/D2Coding.ttf", state.unit // 2)
-
-        self.cell_group.update()
-        self.cell_group.draw(self.screen)
-
-        self.render(state.level, (state.unit // 2, state.unit // 2), size=state.unit, anchor="topleft")
-
-        for i in range(4):
-            start_pos = (state.left + state.unit * 3 * i, state.top)
-            end_pos = (state.left + state.unit * 3 * i, state.bottom)
-            pygame.draw.line(self.screen, (255, 255, 255), start_pos, end_pos, width=3)
-            start_pos = (state.left, state.top + state.unit * 3 * i)
-            end_pos = (state.right, state.top + state.unit * 3 * i)
-            pygame.draw.line(self.screen, (255, 255, 255), start_pos, end_pos, width=3)
-
-        for i in range(9):
-            text = " ".join(map(str, self.grid.top[i]))
-            text_image = state.side_font.render(text, True, (255, 255, 255))
-            text_image = pygame.transform.rotate(text_image, -90)
-            pos = (state.left + state.unit // 2 + state.unit * i, state.top - state.unit // 3)
-            text_rect = text_image.get_rect(midbottom=pos)
-            self.screen.blit(text_image, text_rect)
-
-            text = " ".join(map(str, self.grid.left[i]))
-            text_image = state.side_font.render(text, True, (255, 255, 255))
-            pos = (state.left - state.unit // 3, state.top + state.unit // 2 + state.unit * i)
-            text_rect = text_image.get_rect(midright=pos)
-            self.screen.blit(text_image, text_rect)
-
-        for x, y in product(range(8), range(9)):
-            text_image = state.side_font.render(self.grid.between[y][x], True, (255, 255, 255))
-            pos = (state.left + state.unit * (x + 1), state.top + state.unit // 2 + state.unit * y)
-            text_rect = text_image.get_rect(center=pos)
-            self.screen.blit(text_image, text_rect)
+from array import array
+from math import ceil, floor
+from time import perf_counter
+
+from script.scene import *
+from script.cell import *
+from script.check import *
+from script.text import TextRender, text_cache
+from script.state import state
+from script.file import get_level
+from script.hint import HintEngine
+from script.history import History, layout
+from script.solver import digits
+from script.incremental import IncrementalChecker
+from script.library import get_library, level_file
+from script.profiler import FrameProfiler
+from script.session import MOVE, REDO, TIME, UNDO, Journal, journal_file, restore, snapshot
+from script.watchdog import Watchdog
+
+corner_mods = pygame.KMOD_SHIFT | pygame.KMOD_CTRL
+center_mods = pygame.KMOD_ALT
+keymap = {pygame.K_LEFT: (-1, 0), pygame.K_RIGHT: (1, 0), pygame.K_UP: (0, -1), pygame.K_DOWN: (0, 1)}
+# Digits above 9 are typed as they are written in level files
+letter_keys = {pygame.K_a + k: n for k, n in enumerate(range(10, len(symbols) + 1))}
+
+# Packed cell states from before a move, by cell index
+Before = dict[int, int]
+
+
+class Play(Scene):
+    double_click = 0.5
+
+    def __init__(self, screen: pygame.Surface):
+        from script.scene.select import Select
+
+        super().__init__(screen)
+        self.render = TextRender(screen, state.unit, (255, 255, 255))
+        self.select_scene = Select
+
+        self.cell_group = pygame.sprite.Group()
+        self.grid, self.board, self.variants = get_level(level_file(state.level), self.cell_group)
+        self.geometry = self.board.geometry
+        self.layout = layout(self.board.size)
+        self.checker = IncrementalChecker(self.board, self.variants)
+        self.hints = HintEngine(self.board, self.variants)
+        self.watchdog = Watchdog(level_file(state.level), state.watchdog_budget)
+        self.moves = 0
+        self.dead_since: int | None = None
+        self.auto = False
+        self.selection: set[Point] = set()
+        self.last_selection = (-1, -1)
+        self.history = History(state.history_limit, self.layout)
+
+        self.click_time = 0
+        self.begin_time = perf_counter()
+        self.clear_time = -1
+        self.cleared = False
+
+        self.partial = state.partial_update
+        self.time_text = ""
+        self.time_rect = pygame.Rect(0, 0, 0, 0)
+        self.hint_text = ""
+        self.hint_shown = ""
+        self.hint_rect = pygame.Rect(0, 0, 0, 0)
+        self.watch_text = ""
+        self.watch_shown = ""
+        self.watch_rect = pygame.Rect(0, 0, 0, 0)
+        self.profile: FrameProfiler | None = None
+        self.profile_time = 0
+        self.resume()
+
+    def get_event(self) -> Optional[callback]:
+        # Input comes from the frame's sample, so a recorded session replays exactly
+        mods = state.input.mods
+
+        for event in state.input.events:
+            if event.type == pygame.QUIT:
+                self.close()
+                return End
+            if event.type in (pygame.VIDEORESIZE, pygame.WINDOWEXPOSED):
+                self.redraw = True
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if not (pos := self.get_cell()):
+                    self.selection.clear()
+                    self.last_selection = (-1, -1)
+                    continue
+                now = state.input.time
+                if not mods & (center_mods | corner_mods):
+                    self.selection.clear()
+                    if now - self.click_time >= self.double_click:
+                        self.click_time = now
+                self.selection.add(pos)
+                double_click = pos == self.last_selection
+                self.last_selection = pos
+                if not 0 < now - self.click_time < self.double_click or not double_click:
+                    continue
+                number = self.board[pos]
+                if not number:
+                    continue
+                self.selection |= self.geometry.points(self.board.bits[number])
+            if event.type != pygame.KEYDOWN:
+                continue
+            if event.key == pygame.K_BACKSPACE:
+                self.record(self.fill(self.erase()))
+            if event.key == pygame.K_z:
+                self.undo()
+            if event.key == pygame.K_x:
+                self.redo()
+            if pygame.K_1 <= event.key <= pygame.K_9 or pygame.K_KP1 <= event.key <= pygame.K_KP9:
+                key = 0
+                if pygame.K_1 <= event.key <= pygame.K_9:
+                    key = event.key - pygame.K_0
+                if pygame.K_KP1 <= event.key <= pygame.K_KP9:
+                    key = event.key - pygame.K_KP_1 + 1
+                self.record(self.fill(self.write(key)))
+            if event.key in letter_keys and letter_keys[event.key] <= self.board.size:
+                self.record(self.fill(self.write(letter_keys[event.key])))
+            if event.key in keymap:
+                dx, dy = keymap[event.key]
+                nx, ny = self.last_selection
+                nx += dx
+                ny += dy
+                if not self.geometry.inside(nx, ny):
+                    continue
+                if not mods & (center_mods | corner_mods):
+                    self.selection.clear()
+                self.selection.add((nx, ny))
+                self.last_selection = (nx, ny)
+            if event.key == pygame.K_m:
+                self.toggle_auto()
+            if event.key == pygame.K_h:
+                self.hint()
+            if event.key == pygame.K_F3:
+                self.toggle_profiler()
+            if event.key == pygame.K_ESCAPE:
+                self.close()
+                return self.select_scene
+
+    def close(self):
+        state.input.stop(self.cells())
+        self.journal.close(self.elapsed())
+        self.watchdog.close()
+
+    def write(self, key: int) -> Before:
+        mods = state.input.mods
+        selection = {pos for pos in self.selection if not self.grid[pos].fixed}
+        before = {self.geometry.index(pos): self.pack(pos) for pos in selection}
+        memo_selection = {pos for pos in self.selection if not self.grid[pos].number}
+        if mods & center_mods:
+            if all(key in self.grid[pos].center_memo for pos in memo_selection):
+                for pos in memo_selection:
+                    self.grid[pos].center_memo.remove(key)
+            else:
+                for pos in memo_selection:
+                    self.grid[pos].center_memo.add(key)
+        elif mods & corner_mods:
+            if all(key in self.grid[pos].corner_memo for pos in memo_selection):
+                for pos in memo_selection:
+                    self.grid[pos].corner_memo.remove(key)
+            else:
+                for pos in memo_selection:
+                    self.grid[pos].corner_memo.add(key)
+        else:
+            value = 0 if all(self.grid[pos].number == key for pos in selection) else key
+            for pos in selection:
+                self.set_number(pos, value)
+        return before
+
+    def erase(self) -> Before:
+        selection = {pos for pos in self.selection if not self.grid[pos].fixed}
+        before = {self.geometry.index(pos): self.pack(pos) for pos in selection}
+        if all(self.grid[pos].number for pos in selection):
+            for pos in selection:
+                self.set_number(pos, 0)
+        elif any(self.grid[pos].corner_memo | self.grid[pos].center_memo for pos in selection):
+            for pos in selection:
+                self.grid[pos].corner_memo.clear()
+                self.grid[pos].center_memo.clear()
+        else:
+            for pos in selection:
+                self.set_number(pos, 0)
+        return before
+
+    def pack(self, pos: Point) -> int:
+        cell = self.grid[pos]
+        return self.layout.pack(cell.number, cell.center_memo, cell.corner_memo)
+
+    def record(self, before: Before):
+        entry = self.layout.delta(before, {i: self.pack(self.geometry.positions[i]) for i in before})
+        if entry:
+            self.history.push(entry)
+            self.log(MOVE, entry)
+
+    def resume(self):
+        # Picks up the last session of this level; the journal always starts from a fresh snapshot
+        file = journal_file(state.level, state.session_directory)
+        session = restore(file, state.history_limit, self.layout)
+        if session is not None:
+            cells, history, elapsed = session
+            if all(self.layout.number(cells[i]) == n for i, n in enumerate(self.board.values) if n):
+                for i, cell in enumerate(cells):
+                    pos = self.geometry.positions[i]
+                    number, self.grid[pos].center_memo, self.grid[pos].corner_memo = self.layout.unpack(cell)
+                    if not self.grid[pos].fixed:
+                        self.set_number(pos, number)
+                self.history = history
+                self.begin_time -= elapsed
+        self.hints.update()
+        self.journal = Journal(file)
+        self.journal.snapshot(self.cells(), self.history, self.elapsed())
+        self.saved_time = perf_counter()
+        self.watchdog.submit(self.moves, self.board.values)
+        state.input.start(state.level, list(snapshot(self.cells(), self.history)), self.layout.typecode)
+
+    def cells(self) -> list[int]:
+        return [self.pack(pos) for pos in self.geometry.positions]
+
+    def elapsed(self) -> float:
+        return self.clear_time if self.clear_time >= 0 else perf_counter() - self.begin_time
+
+    def log(self, kind: bytes, entry: array = None):
+        self.saved_time = perf_counter()
+        if self.journal.append(kind, self.elapsed(), entry):
+            self.journal.snapshot(self.cells(), self.history, self.elapsed())
+        if kind != TIME:
+            self.moves += 1
+            self.watchdog.submit(self.moves, self.board.values)
+
+    def watch(self):
+        # Reports only arrive for the newest move; a dead end keeps the move it was first seen at
+        if (report := self.watchdog.poll()) is None:
+            return
+        move, solvable = report
+        if solvable:
+            self.dead_since = None
+        elif self.dead_since is None:
+            self.dead_since = move
+        self.watch_text = "" if self.dead_since is None else f"dead end since move {self.dead_since}"
+
+    def set_number(self, pos: Point, number: int):
+        self.grid[pos].number = number
+        self.board[pos] = number
+        self.checker.mark(pos)
+        self.hints.mark(pos)
+        self.hint_text = ""
+
+    def hint(self):
+        hint = self.hints.next_hint()
+        if hint is None:
+            self.hint_text = "no hint"
+            return
+        # Only the target cell is selected for a placement, so the digit can be typed right away
+        self.selection = {hint["place"]} if hint["place"] else set(hint["cells"])
+        self.last_selection = hint["place"] or (-1, -1)
+        text = f"{hint['kind']} {''.join(symbols[d - 1] for d in hint['digits'])}"
+        if hint["eliminate"]:
+            text += " / " + " ".join(f"r{y + 1}c{x + 1}" for x, y in hint["eliminate"])
+        self.hint_text = text.strip()
+
+    def toggle_auto(self):
+        self.auto = not self.auto
+        if not self.auto:
+            return
+        self.hints.update()
+        before: Before = {}
+        for i, candidates in enumerate(self.hints.candidates):
+            pos = self.geometry.positions[i]
+            cell = self.grid[pos]
+            if not cell.number:
+                before[i] = self.pack(pos)
+                cell.center_memo = set(digits(candidates))
+        self.record(before)
+
+    def fill(self, before: Before) -> Before:
+        # Center marks follow candidate changes without undoing the player's own removals;
+        # only the cells whose candidates changed are touched, and it all goes into the same history entry
+        changed = self.hints.update()
+        if not self.auto:
+            return before
+        # A cell that was just emptied gets all of its candidates back
+        emptied = {i for i, cell in before.items() if self.layout.number(cell) and not self.board.values[i]}
+        for i in set(changed) | emptied:
+            pos = self.geometry.positions[i]
+            cell = self.grid[pos]
+            if cell.number:
+                continue
+            candidates = self.hints.candidates[i]
+            if i in emptied:
+                memo = set(digits(candidates))
+            else:
+                memo = {n for n in cell.center_memo if candidates >> n & 1} | set(digits(candidates & ~changed[i]))
+            if memo != cell.center_memo:
+                before.setdefault(i, self.pack(pos))
+                cell.center_memo = memo
+        return before
+
+    def apply(self, entry: array):
+        # The same entry undoes and redoes a move, touching only the cells it changed
+        for i, d in self.layout.changes(entry):
+            pos = self.geometry.positions[i]
+            cell = self.grid[pos]
+            number, cell.center_memo, cell.corner_memo = self.layout.unpack(self.pack(pos) ^ d)
+            if number != cell.number:
+                self.set_number(pos, number)
+        self.hints.update()
+
+    def undo(self):
+        if (entry := self.history.undo()) is not None:
+            self.apply(entry)
+            self.log(UNDO)
+
+    def redo(self):
+        if (entry := self.history.redo()) is not None:
+            self.apply(entry)
+            self.log(REDO)
+
+    def toggle_profiler(self):
+        if state.profiler is None:
+            state.profiler = FrameProfiler(output=state.profile_output)
+        else:
+            state.profiler.close()
+            state.profiler = None
+        self.redraw = True
+
+    def timeout(self) -> Optional[int]:
+        if self.redraw or self.clear_time >= 0:
+            return super().timeout()
+        # The timer shows tenths of a second
+        elapsed = perf_counter() - self.begin_time
+        return ceil(((floor(elapsed * 10) + 1) / 10 - elapsed) * 1000)
+
+    @staticmethod
+    def get_cell() -> Optional[Point]:
+        mx, my = state.input.mouse
+        x, y = (mx - state.left) // state.unit, (my - state.top) // state.unit
+        if not (0 <= x < state.size and 0 <= y < state.size):
+            return
+        return x, y
+
+    def run(self) -> Optional[callback]:
+        # Phases are timed only while the profiler is on; otherwise each lap is a skipped branch
+        profile = self.profile = state.profiler
+        if profile:
+            profile.start()
+
+        result = self.get_event()
+        if result is not None:
+            return result
+
+        if any(state.input.buttons):
+            if pos := self.get_cell():
+                self.selection.add(pos)
+                self.last_selection = pos
+
+        for pos in self.geometry.positions:
+            self.grid[pos].selected = pos in self.selection
+            self.grid[pos].last_selected = pos == self.last_selection
+        if profile:
+            profile.lap("event")
+
+        self.watch()
+        for pos in self.checker.update():
+            self.grid[pos].error = pos in self.checker.errors
+        errors = self.checker.errors
+
+        cleared = not self.board.bits[0] and not errors
+        if cleared and self.clear_time < 0:
+            self.clear_time = perf_counter() - self.begin_time
+            get_library().mark_solved(state.level, self.clear_time)
+        if cleared != self.cleared:
+            self.cleared = cleared
+            self.redraw = True
+        if profile:
+            profile.lap("check")
+
+        full = self.redraw or not self.partial
+        background = (48, 48, 48) if cleared else (0, 0, 0)
+        if full:
+            self.screen.fill(background)
+
+        time = self.elapsed()
+        if perf_counter() - self.saved_time > 5 and self.clear_time < 0:
+            self.log(TIME)
+        time_text = f"{time:05.1f}"
+        if full or time_text != self.time_text:
+            pos = (state.unit // 2, state.height - state.unit // 2)
+            rect = self.render.get_rect(time_text, pos, size=state.unit * 2 // 3, anchor="bottomleft")
+            if not full:
+                self.screen.fill(background, self.time_rect)
+                self.dirty += [self.time_rect, rect]
+            self.render(time_text, pos, size=state.unit * 2 // 3, anchor="bottomleft")
+            self.time_text, self.time_rect = time_text, rect
+        if full or self.hint_text != self.hint_shown:
+            pos = (state.width - state.unit // 2, state.height - state.unit // 2)
+            rect = self.render.get_rect(self.hint_text, pos, size=state.unit // 2, anchor="bottomright")
+            if not full:
+                self.screen.fill(background, self.hint_rect)
+                self.dirty += [self.hint_rect, rect]
+            self.render(self.hint_text, pos, size=state.unit // 2, anchor="bottomright")
+            self.hint_shown, self.hint_rect = self.hint_text, rect
+        if full or self.watch_text != self.watch_shown:
+            pos = (state.width - state.unit // 2, state.unit // 2)
+            rect = self.render.get_rect(self.watch_text, pos, size=state.unit // 2, anchor="topright")
+            if not full:
+                self.screen.fill(background, self.watch_rect)
+                self.dirty += [self.watch_rect, rect]
+            self.render(self.watch_text, pos, size=state.unit // 2, color=(255, 96, 96), anchor="topright")
+            self.watch_shown, self.watch_rect = self.watch_text, rect
+        if profile:
+            profile.lap("timer")
+
+        self.cell_group.update()
+        if full:
+            self.cell_group.draw(self.screen)
+            self.render(state.level, (state.unit // 2, state.unit // 2), size=state.unit, anchor="topleft")
+        else:
+            for cell in self.cell_group:
+                if cell.changed:
+                    self.screen.blit(cell.image, cell.rect)
+                    self.dirty.append(cell.rect)
+        if profile:
+            profile.lap("cells")
+
+        box_height, box_width = self.geometry.box
+        for x in range(0, self.board.size + 1, box_width):
+            start_pos = (state.left + state.unit * x, state.top)
+            end_pos = (state.left + state.unit * x, state.bottom)
+            pygame.draw.line(self.screen, (255, 255, 255), start_pos, end_pos, width=3)
+        for y in range(0, self.board.size + 1, box_height):
+            start_pos = (state.left, state.top + state.unit * y)
+            end_pos = (state.right, state.top + state.unit * y)
+            pygame.draw.line(self.screen, (255, 255, 255), start_pos, end_pos, width=3)
+        if profile:
+            profile.lap("grid")
+
+        self.draw_clues(full)
+        if profile:
+            profile.lap("clues")
+            self.draw_profile(profile, full, background)
+            profile.lap("overlay")
+
+    def flip(self):
+        super().flip()
+        if self.profile:
+            self.profile.lap("display")
+            self.profile.end()
+
+    def draw_clues(self, full: bool):
+        if not full:
+            # Bars straddle two cells; clip so the unchanged neighbour is not blended twice
+            for cell in self.cell_group:
+                if cell.changed:
+                    self.screen.set_clip(cell.rect)
+                    for x in range(max(0, cell.x - 1), min(self.board.size - 1, cell.x + 1)):
+                        self.draw_between(x, cell.y)
+            self.screen.set_clip(None)
+            return
+
+        for i in range(self.board.size):
+            text = " ".join(map(str, self.board.top[i]))
+            text_image = text_cache.get(text, state.unit // 2, (255, 255, 255))
+            text_image = pygame.transform.rotate(text_image, -90)
+            pos = (state.left + state.unit // 2 + state.unit * i, state.top - state.unit // 3)
+            text_rect = text_image.get_rect(midbottom=pos)
+            self.screen.blit(text_image, text_rect)
+
+            text = " ".join(map(str, self.board.left[i]))
+            text_image = text_cache.get(text, state.unit // 2, (255, 255, 255))
+            pos = (state.left - state.unit // 3, state.top + state.unit // 2 + state.unit * i)
+            text_rect = text_image.get_rect(midright=pos)
+            self.screen.blit(text_image, text_rect)
+
+        for i, _ in self.geometry.horizontal_pairs:
+            self.draw_between(*self.geometry.positions[i])
+
+    def draw_profile(self, profile: FrameProfiler, full: bool, background: tuple[int, int, int]):
+        # Refreshed a few times a second so it stays readable; drawn right of the grid, where nothing else is
+        now = perf_counter()
+        if not full and now - self.profile_time < 0.25:
+            return
+        self.profile_time = now
+        left = state.right + state.unit // 4
+        area = pygame.Rect(left, 0, state.width - left, state.height - state.unit)
+        self.screen.fill(background, area)
+        self.screen.set_clip(area)
+        size = state.unit // 3
+        for i, line in enumerate(profile.lines()):
+            pos = (left, state.unit // 2 + size * i)
+            self.render(line, pos, size=size, color=(160, 160, 160), anchor="topleft")
+        self.screen.set_clip(None)
+        if not full:
+            self.dirty.append(area)
+
+    def draw_between(self, x: int, y: int):
+        text_image = text_cache.get(self.board.between[y][x], state.unit // 2, (255, 255, 255))
+        pos = (state.left + state.unit * (x + 1), state.top + state.unit // 2 + state.unit * y)
+        text_rect = text_image.get_rect(center=pos)
+        self.screen.blit(text_image, text_rect)
@@ -1,54 +1,120 @@
+from time import perf_counter
+
 import pygame
 
 from script.scene import *
 from script.text import TextRender
 from script.state import state
-from script.file import get_level_list
+from script.library import get_library, level_file, sort_keys
+from script.warmup import warmup
 
-KEYMAP = {pygame.K_UP: -1, pygame.K_DOWN: 1}
+KEYMAP = {pygame.K_UP: -1, pygame.K_DOWN: 1, pygame.K_PAGEUP: -10, pygame.K_PAGEDOWN: 10}
+ROWS = 10
 
 
 class Select(Scene):
     def __init__(self, screen: pygame.Surface):
-        from script.scene.play import Play
-
         super().__init__(screen)
+        # The list keeps the classic layout whatever size the last board was
+        state.size = 9
         self.render = TextRender(screen, size=state.unit // 2, color=(24, 24, 30))
-        self.play_scene = Play
-        self.level_list = get_level_list()
+        self.library = get_library()
+        self.library.scan()
+        self.query = ()
+        self.query_time = 0.0
+        self.level_list: list[str] = []
+        self.warmed = ((), -1)
+
+    def refresh(self):
+        # The list is only rebuilt when the index, the filter or the sort order changes
+        query = (self.library.version, state.level_filter, state.level_sort)
+        if query == self.query:
+            return
+        # While the index is being built the list is refreshed twice a second at most
+        if self.library.busy and query[1:] == self.query[1:] and perf_counter() - self.query_time < 0.5:
+            return
+        self.query, self.query_time = query, perf_counter()
+        current = self.level_list[state.level_selection] if self.level_list else state.level
+        self.level_list = self.library.query(state.level_filter.split(), tuple(sort_keys)[state.level_sort])
+        try:
+            state.level_selection = self.level_list.index(current)
+        except ValueError:
+            state.level_selection = 0
+
+    def move(self, step: int):
+        if self.level_list:
+            state.level_selection = (state.level_selection + step) % len(self.level_list)
+
+    def play(self) -> Optional[callback]:
+        # Play and the checkers are only imported once a level is opened; the warm-up has usually done it by then
+        from script.scene.play import Play
+
+        if not self.level_list:
+            return
+        state.level = self.level_list[state.level_selection]
+        return Play
 
     def get_event(self) -> Optional[callback]:
-        for event in pygame.event.get():
+        for event in state.input.events:
             if event.type == pygame.QUIT:
                 return End
             if event.type == pygame.MOUSEWHEEL:
-                state.level_selection -= event.y
-                state.level_selection %= len(self.level_list)
+                self.move(-event.y)
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
-                    state.level = self.level_list[state.level_selection]
-                    return self.play_scene
+                    return self.play()
             if event.type != pygame.KEYDOWN:
                 continue
             if event.key == pygame.K_ESCAPE:
-                return End
-            if event.key in (pygame.K_SPACE, pygame.K_RETURN):
-                state.level = self.level_list[state.level_selection]
-                return self.play_scene
-            if event.key in KEYMAP:
-                state.level_selection += KEYMAP[event.key]
-                state.level_selection %= len(self.level_list)
+                if not state.level_filter:
+                    return End
+                state.level_filter = ""
+            elif event.key == pygame.K_RETURN or event.key == pygame.K_SPACE and not state.level_filter:
+                return self.play()
+            elif event.key in KEYMAP:
+                self.move(KEYMAP[event.key])
+            elif event.key == pygame.K_HOME:
+                state.level_selection = 0
+            elif event.key == pygame.K_END:
+                state.level_selection = max(0, len(self.level_list) - 1)
+            elif event.key == pygame.K_TAB:
+                state.level_sort = (state.level_sort + 1) % len(sort_keys)
+            elif event.key == pygame.K_BACKSPACE:
+                state.level_filter = state.level_filter[:-1]
+            elif event.unicode.isalpha() or event.unicode in "? ":
+                state.level_filter += event.unicode.upper()
+            self.refresh()
+
+    def timeout(self) -> Optional[int]:
+        return 0 if self.library.busy else super().timeout()
 
     def run(self) -> Optional[callback]:
+        self.library.update(0.01)
+        self.refresh()
         result = self.get_event()
         if result is not None:
             return result
 
         if state.level_selection < state.level_offset:
             state.level_offset = state.level_selection
-        elif state.level_selection >= state.level_offset + 10:
-            state.level_offset = state.level_selection - 9
+        elif state.level_selection >= state.level_offset + ROWS:
+            state.level_offset = state.level_selection - ROWS + 1
+        if (self.query, state.level_offset) != self.warmed:
+            self.warmed = (self.query, state.level_offset)
+            rows = self.level_list[state.level_offset: state.level_offset + ROWS]
+            warmup.submit(level_file(level) for level in rows)
+
+        header = f"{state.level_filter or '*'} / {tuple(sort_keys)[state.level_sort]} / {len(self.level_list)}"
+        self.render(header, (state.width // 2, state.top - state.unit), size=state.unit // 3, color=(128, 128, 128))
 
-        for i, level in enumerate(self.level_list[state.level_offset: state.level_offset + 10]):
-            color = (255, 255, 0) if i + state.level_offset == state.level_selection else (255, 255, 255)
-            self.render(level, (state.width // 2, state.top + state.unit * i), size=state.unit // 2, color=color)
+        # Only the rows on screen are looked up and rendered
+        for i, level in enumerate(self.level_list[state.level_offset: state.level_offset + ROWS]):
+            if i + state.level_offset == state.level_selection:
+                color = (255, 255, 0)
+            elif self.library.levels[level]["solved"] is not None:
+                color = (120, 220, 120)
+            else:
+                color = (255, 255, 255)
+            difficulty = self.library.levels[level]["difficulty"]
+            text = level if difficulty is None else f"{level}  {difficulty:.1f}"
+            self.render(text, (state.width // 2, state.top + state.unit * i), size=state.unit // 2, color=color)
@@ -0,0 +1,136 @@
+import struct
+from array import array
+from os import makedirs, path, replace
+from queue import SimpleQueue
+from threading import Thread
+
+from script.cache import cache_directory
+from script.history import History, Layout
+
+session_directory = path.join(cache_directory, "session")
+# Record type, payload length in words, elapsed seconds
+record = struct.Struct("<cId")
+MOVE, UNDO, REDO, TIME, SNAPSHOT = b"M", b"U", b"R", b"T", b"S"
+
+
+def journal_file(level: str, directory: str = session_directory) -> str:
+    return path.join(directory, f"{level}.journal")
+
+
+def snapshot(cells: list[int], history: History) -> array:
+    words = array(history.layout.typecode, cells)
+    for stack in (history.entries, history.undone):
+        words.append(len(stack))
+        for entry in stack:
+            words.append(len(entry))
+            words.extend(entry)
+    return words
+
+
+def write_snapshot(file: str, words: array, elapsed: float = 0.0):
+    # A journal holding nothing but a snapshot, as Journal.snapshot leaves it
+    makedirs(path.dirname(file), exist_ok=True)
+    with open(file, "wb") as f:
+        f.write(record.pack(SNAPSHOT, len(words), elapsed) + words.tobytes())
+
+
+def restore(file: str, limit: int, cell_layout: Layout) -> tuple[list[int], History, float] | None:
+    # Replays the journal from its latest snapshot; a torn record at the end is ignored
+    try:
+        with open(file, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    cells: list[int] | None = None
+    history = History(limit, cell_layout)
+    count = cell_layout.size ** 2
+    word = array(cell_layout.typecode).itemsize
+    elapsed = 0.0
+    offset = 0
+    while offset + record.size <= len(data):
+        kind, length, time = record.unpack_from(data, offset)
+        end = offset + record.size + length * word
+        if end > len(data):
+            break
+        words = array(cell_layout.typecode, data[offset + record.size: end])
+        offset = end
+        if kind == SNAPSHOT:
+            if len(words) < count:
+                break
+            cells = list(words[:count])
+            stacks = []
+            k = count
+            for _ in range(2):
+                stack = []
+                for _ in range(words[k]):
+                    stack.append(words[k + 2: k + 2 + words[k + 1]])
+                    k += 1 + words[k + 1]
+                k += 1
+                stacks.append(stack)
+            history.load(*stacks)
+        elif cells is not None and kind != TIME:
+            if kind == MOVE:
+                history.push(words)
+                entry = words
+            else:
+                entry = history.undo() if kind == UNDO else history.redo()
+            for i, d in cell_layout.changes(entry or ()):
+                cells[i] ^= d
+        elapsed = time
+    if cells is None:
+        return None
+    return cells, history, elapsed
+
+
+class Journal:
+    snapshot_every = 512
+
+    def __init__(self, file: str):
+        self.file = file
+        self.records = 0
+        self.queue: SimpleQueue[tuple[bytes, bool] | None] = SimpleQueue()
+        self.thread = Thread(target=self.writer, daemon=True)
+        self.thread.start()
+
+    def writer(self):
+        # Runs off the render thread; records are buffered and flushed whenever the queue runs dry
+        f = None
+        while (item := self.queue.get()) is not None:
+            data, compact = item
+            try:
+                if compact:
+                    if f is not None:
+                        f.close()
+                    makedirs(path.dirname(self.file), exist_ok=True)
+                    with open(self.file + ".tmp", "wb") as tmp:
+                        tmp.write(data)
+                    replace(self.file + ".tmp", self.file)
+                    f = open(self.file, "ab")
+                elif f is not None:
+                    f.write(data)
+                if f is not None and self.queue.empty():
+                    f.flush()
+            except OSError:
+                f = None
+        if f is not None:
+            f.close()
+
+    def write(self, kind: bytes, elapsed: float, words: array = None, compact: bool = False):
+        payload = words.tobytes() if words is not None else b""
+        self.queue.put((record.pack(kind, len(words) if words is not None else 0, elapsed) + payload, compact))
+
+    def snapshot(self, cells: list[int], history: History, elapsed: float):
+        self.records = 0
+        self.write(SNAPSHOT, elapsed, snapshot(cells, history), compact=True)
+
+    def append(self, kind: bytes, elapsed: float, words: array = None) -> bool:
+        # True once the journal has grown enough to be compacted into a new snapshot
+        self.write(kind, elapsed, words)
+        self.records += 1
+        return self.records >= self.snapshot_every
+
+    def close(self, elapsed: float):
+        self.write(TIME, elapsed)
+        self.queue.put(None)
+        self.thread.join()
@@ -0,0 +1,161 @@
+from random import Random
+from time import perf_counter
+
+from script.check import *
+
+
+def every(size: int) -> int:
+    # Candidate mask with bits 1 to size set
+    return (1 << size + 1) - 2
+
+
+def digits(candidates: int) -> list[int]:
+    return [d for d in range(1, candidates.bit_length()) if candidates >> d & 1]
+
+
+class Solver:
+    def __init__(self, board: Board, variants: list[str]):
+        unit_list = v_units(board, tuple(a in variants for a in ("??", "A?R", "??")))
+        for variant in variants:
+            unit_list += units[variant](board)
+
+        self.size, self.cells = board.size, board.geometry.cells
+        self.all = every(board.size)
+        self.groups: list[Indices] = []
+        self.rules: list[tuple[Indices, RuleType]] = []
+        for cells, rule in unit_list:
+            if rule is duplicates:
+                self.groups.append(cells)
+            else:
+                self.rules.append((cells, rule))
+        self.houses = [group for group in self.groups if len(group) == self.size]
+
+        peers: list[set[int]] = [set() for _ in range(self.cells)]
+        for group in self.groups:
+            for i in group:
+                peers[i].update(group)
+        self.peers = [tuple(peers[i] - {i}) for i in range(self.cells)]
+        self.cell_rules: list[list[int]] = [[] for _ in range(self.cells)]
+        for r, (cells, _) in enumerate(self.rules):
+            for i in cells:
+                self.cell_rules[i].append(r)
+
+        self.givens = bytes(board.values)
+        self.deadline: float | None = None
+        self.rng: Random | None = None
+        # Polled like the deadline; lets a caller abandon a search that is no longer wanted
+        self.cancelled: Callable[[], bool] | None = None
+
+    def start(self, exclude: tuple[int, int] = None) -> tuple[bytearray, list[int]] | None:
+        values = bytearray(self.cells)
+        candidates = [self.all] * self.cells
+        if exclude is not None:
+            candidates[exclude[0]] ^= 1 << exclude[1]
+        for i, n in enumerate(self.givens):
+            if n and not (candidates[i] >> n & 1 and self.assign(values, candidates, i, n)):
+                return None
+        for r in range(len(self.rules)):
+            if not self.prune(values, candidates, r):
+                return None
+        return values, candidates
+
+    def assign(self, values: bytearray, candidates: list[int], i: int, n: int) -> bool:
+        values[i] = n
+        candidates[i] = bit = 1 << n
+        for j in self.peers[i]:
+            if candidates[j] & bit:
+                candidates[j] ^= bit
+                if not candidates[j]:
+                    return False
+        for r in self.cell_rules[i]:
+            if not self.prune(values, candidates, r):
+                return False
+        return True
+
+    def prune(self, values: bytearray, candidates: list[int], r: int) -> bool:
+        cells, rule = self.rules[r]
+        numbers = [values[i] for i in cells]
+        if rule(numbers):
+            return False
+        for k in [k for k, n in enumerate(numbers) if not n]:
+            for n in digits(candidates[cells[k]]):
+                numbers[k] = n
+                if rule(numbers):
+                    candidates[cells[k]] ^= 1 << n
+            numbers[k] = 0
+            if not candidates[cells[k]]:
+                return False
+        return True
+
+    def propagate(self, values: bytearray, candidates: list[int]) -> bool:
+        changed = True
+        while changed:
+            changed = False
+            for i in range(self.cells):
+                c = candidates[i]
+                if values[i]:
+                    continue
+                if not c:
+                    return False
+                if not c & (c - 1):
+                    if not self.assign(values, candidates, i, c.bit_length() - 1):
+                        return False
+                    changed = True
+            for house in self.houses:
+                once = twice = 0
+                for i in house:
+                    twice |= once & candidates[i]
+                    once |= candidates[i]
+                if once != self.all:
+                    return False
+                single = once & ~twice
+                if not single:
+                    continue
+                for i in house:
+                    c = candidates[i] & single
+                    if c and not values[i]:
+                        if c & (c - 1) or not self.assign(values, candidates, i, c.bit_length() - 1):
+                            return False
+                        changed = True
+        return True
+
+    def search(self, values: bytearray, candidates: list[int], solutions: list[bytes], limit: int):
+        if not self.propagate(values, candidates):
+            return
+        empty = [i for i in range(self.cells) if not values[i]]
+        if not empty:
+            solutions.append(bytes(values))
+            return
+        if self.deadline is not None and perf_counter() > self.deadline:
+            raise TimeoutError
+        if self.cancelled is not None and self.cancelled():
+            raise TimeoutError
+        i = min(empty, key=lambda j: candidates[j].bit_count())
+        order = digits(candidates[i])
+        if self.rng is not None:
+            self.rng.shuffle(order)
+        for n in order:
+            next_values, next_candidates = values[:], candidates[:]
+            if self.assign(next_values, next_candidates, i, n):
+                self.search(next_values, next_candidates, solutions, limit)
+            if len(solutions) >= limit:
+                return
+
+    def solve(self, limit: int = 2, deadline: float = None, rng: Random = None,
+              exclude: tuple[int, int] = None) -> list[bytes]:
+        self.deadline, self.rng = deadline, rng
+        solutions: list[bytes] = []
+        if (begin := self.start(exclude)) is not None:
+            self.search(*begin, solutions, limit)
+        return solutions
+
+    def count(self, limit: int = 2, deadline: float = None) -> int:
+        return len(self.solve(limit, deadline))
+
+
+def solve(board: Board, variants: list[str], limit: int = 2) -> list[bytes]:
+    return Solver(board, variants).solve(limit)
+
+
+def count_solutions(board: Board, variants: list[str], limit: int = 2) -> int:
+    return Solver(board, variants).count(limit)
@@ -1,46 +1,57 @@
-import pygame
-
-
-class State:
-    number_font: pygame.font.Font
-    note_font: pygame.font.Font
-    memo_font: pygame.font.Font
-
-    def __init__(self):
-        self.fps = 60
-        self.side_clue = False
-
-        self.level = ""
-        self.level_selection = 0
-        self.level_offset = 0
-
-    @property
-    def width(self) -> int:
-        return pygame.display.get_window_size()[0]
-
-    @property
-    def height(self) -> int:
-        return pygame.display.get_window_size()[1]
-
-    @property
-    def unit(self) -> int:
-        return min(self.width // 12, self.height // 12)
-
-    @property
-    def left(self) -> int:
-        return self.width // 2 - self.unit * 9 // 2 + self.unit * self.side_clue
-
-    @property
-    def top(self) -> int:
-        return self.height // 2 - self.unit * 9 // 2 + self.unit * self.side_clue
-
-    @property
-    def right(self) -> int:
-        return self.width // 2 + self.unit * 9 // 2 + self.unit * self.side_clue
-
-    @property
-    def bottom(self) -> int:
-        return self.height // 2 + self.unit * 9 // 2 + self.unit * self.side_clue
-
-
-state = State()
+import pygame
+
+from script.events import Input
+from script.profiler import FrameProfiler
+from script.session import session_directory
+
+
+class State:
+    def __init__(self):
+        self.fps = 60
+        self.size = 9
+        self.side_clue = False
+        self.partial_update = True
+        self.history_limit = 1 << 20
+        self.watchdog_budget = 2.0
+        self.profiler: FrameProfiler | None = None
+        self.profile_output = ""
+        self.input = Input()
+        self.session_directory = session_directory
+
+        self.level = ""
+        self.level_selection = 0
+        self.level_offset = 0
+        self.level_filter = ""
+        self.level_sort = 0
+
+    @property
+    def width(self) -> int:
+        return pygame.display.get_window_size()[0]
+
+    @property
+    def height(self) -> int:
+        return pygame.display.get_window_size()[1]
+
+    @property
+    def unit(self) -> int:
+        # The grid plus a unit and a half of margin on each side
+        return min(self.width, self.height) // (self.size + 3)
+
+    @property
+    def left(self) -> int:
+        return self.width // 2 - self.unit * self.size // 2 + self.unit * self.side_clue
+
+    @property
+    def top(self) -> int:
+        return self.height // 2 - self.unit * self.size // 2 + self.unit * self.side_clue
+
+    @property
+    def right(self) -> int:
+        return self.width // 2 + self.unit * self.size // 2 + self.unit * self.side_clue
+
+    @property
+    def bottom(self) -> int:
+        return self.height // 2 + self.unit * self.size // 2 + self.unit * self.side_clue
+
+
+state = State()
@@ -1,7 +1,59 @@
+from collections import OrderedDict
+from io import BytesIO
+
 import pygame
 
+from script.state import state
+
 PosType = (pygame.math.Vector2 | tuple[int, int])
 ColorType = (pygame.color.Color | tuple[int, int, int] | tuple[int, int, int, int])
+TextKey = tuple[str, int, tuple[int, int, int, int], int | None, str]
+
+
+class TextCache:
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.unit = 0
+        self.fonts: dict[tuple[str, int], pygame.font.Font] = {}
+        # Font files are read once and kept, so new sizes after a resize never touch the disk
+        self.files: dict[str, bytes] = {}
+        self.images: OrderedDict[TextKey, pygame.Surface] = OrderedDict()
+
+    def load(self, font: str) -> bytes:
+        # Safe off the main thread; only the Font objects themselves must be made on it
+        if font not in self.files:
+            with open(f"resource/font/{font}", "rb") as f:
+                self.files[font] = f.read()
+        return self.files[font]
+
+    def font(self, font: str, size: int) -> pygame.font.Font:
+        if (font, size) not in self.fonts:
+            self.fonts[font, size] = pygame.font.Font(BytesIO(self.load(font)), size)
+        return self.fonts[font, size]
+
+    def get(self, text: str, size: int, color: ColorType, alpha: int = None,
+            font: str = "D2Coding.ttf") -> pygame.Surface:
+        # Every size is derived from the unit, so nothing survives a resize
+        if state.unit != self.unit:
+            self.unit = state.unit
+            self.fonts.clear()
+            self.images.clear()
+
+        key = (text, size, tuple(pygame.color.Color(color)), alpha, font)
+        if (image := self.images.get(key)) is not None:
+            self.images.move_to_end(key)
+            return image
+
+        image = self.font(font, size).render(text, True, key[2]).convert_alpha()
+        if alpha is not None:
+            image.fill((255, 255, 255, alpha), None, pygame.BLEND_RGBA_MULT)
+        self.images[key] = image
+        if len(self.images) > self.maxsize:
+            self.images.popitem(last=False)
+        return image
+
+
+text_cache = TextCache()
 
 
 class TextRender:
@@ -28,13 +80,7 @@ class TextRender:
         if font is None:
             font = self.font
 
-        color = pygame.color.Color(color)
-
-        text_font = pygame.font.Font(f"resource/font/{font}", size)
-        text_image = text_font.render(text, True, color).convert_alpha()
-        if alpha is not None:
-            text_image.fill((255, 255, 255, alpha), None, pygame.BLEND_RGBA_MULT)
-        return text_image
+        return text_cache.get(text, size, color, alpha, font)
 
     def blit(self, text_image: pygame.Surface, pos: PosType, anchor: str = "center"):
         pos = pygame.math.Vector2(pos)
@@ -0,0 +1,75 @@
+import json
+import sys
+from argparse import ArgumentParser
+from functools import partial
+from multiprocessing import Pool
+from os import cpu_count, listdir, path
+from time import perf_counter
+
+from script.check import *
+from script.level import read_level
+from script.pack import get_pack, open_level
+from script.solver import Solver
+
+
+def validate(file: str, limit: int = 2) -> dict:
+    begin = perf_counter()
+    report = {"file": file}
+    try:
+        board, variants = open_level(file, read_level)
+    except (OSError, ValueError, IndexError, KeyError) as e:
+        return report | {"valid": False, "error": f"parse: {e!r}"}
+    report["variants"] = variants
+    report["givens"] = board.geometry.cells - board.bits[0].bit_count()
+    if unknown := [v for v in variants if v not in checkers]:
+        return report | {"valid": False, "error": f"unknown variants: {' '.join(unknown)}"}
+
+    try:
+        errors = v_check(board, tuple(a in variants for a in ("??", "A?R", "??")))
+        errors |= compile_units(board, variants).check(board)
+        solutions = Solver(board, variants).count(limit)
+    except (ValueError, IndexError, KeyError) as e:
+        return report | {"valid": False, "error": f"clue: {e!r}"}
+
+    report["conflicts"] = sorted(errors)
+    report["solutions"] = solutions
+    report["valid"] = not errors and solutions == 1
+    report["time"] = round(perf_counter() - begin, 4)
+    return report
+
+
+def level_files(directory: str) -> list[str]:
+    files = []
+    for file in sorted(listdir(directory)):
+        if file.endswith(".sudoku"):
+            files.append(path.join(directory, file))
+        elif file.endswith(".pack"):
+            pack = path.join(directory, file)
+            files += [f"{pack}#{i}" for i in range(len(get_pack(pack)))]
+    return files
+
+
+def main(argv: list[str] = None) -> int:
+    parser = ArgumentParser(description="Validate every .sudoku level and puzzle pack in a directory.")
+    parser.add_argument("directory", nargs="?", default="level/")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-l", "--limit", type=int, default=2, help="stop counting solutions at this many")
+    parser.add_argument("-o", "--output", default="-", help="JSON Lines report file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    files = level_files(args.directory)
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="UTF-8")
+    invalid = 0
+    jobs = args.jobs or cpu_count()
+    with Pool(jobs) as pool:
+        for report in pool.imap(partial(validate, limit=args.limit), files, max(1, len(files) // (jobs * 16))):
+            invalid += not report["valid"]
+            output.write(json.dumps(report, ensure_ascii=False) + "\n")
+    if output is not sys.stdout:
+        output.close()
+    print(f"{len(files) - invalid}/{len(files)} valid", file=sys.stderr)
+    return 1 if invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+from functools import partial
+from itertools import product
+from typing import Callable, NamedTuple
+
+from script.board import *
+
+RuleType = Callable[[list[int]], set[int]]
+Unit = tuple[Indices, RuleType]
+UnitsType = Callable[[Board], list[Unit]]
+
+# Units of up to this many cells are compiled into lookup tables indexed by their digits
+table_arity = 4
+
+
+class Variant(NamedTuple):
+    units: UnitsType
+    side: bool = False
+
+
+variants: dict[str, Variant] = {}
+
+
+def variant(code: str, side: bool = False) -> Callable[[UnitsType], UnitsType]:
+    def register(units: UnitsType) -> UnitsType:
+        variants[code] = Variant(units, side)
+        return units
+    return register
+
+
+def duplicates(numbers: list[int]) -> set[int]:
+    return {i for i, n in enumerate(numbers) if n and numbers.count(n) > 1}
+
+
+def within(allowed: tuple[int, ...], numbers: list[int]) -> set[int]:
+    return set() if numbers[0] in allowed else {0}
+
+
+# Declarations take flat index tuples, usually straight from board.geometry (translations() for new shapes)
+def unique(groups: Iterable[Indices]) -> list[Unit]:
+    return [(tuple(group), duplicates) for group in groups]
+
+
+def window(rule: RuleType, table: Iterable[Indices]) -> list[Unit]:
+    return [(tuple(indices), rule) for indices in table]
+
+
+def allowed(digits: Iterable[tuple[int, tuple[int, ...]]]) -> list[Unit]:
+    return [((i,), partial(within, (0,) + allowed_digits)) for i, allowed_digits in digits]
+
+
+def clued(rule: Callable[..., set[int]], board: Board) -> list[Unit]:
+    g = board.geometry
+    lines = list(zip(g.rows, board.left)) + list(zip(g.columns, board.top))
+    return [(indices, partial(rule, clue=clue)) for indices, clue in lines if clue]
+
+
+def noted(board: Board) -> list[tuple[int, str]]:
+    return [(i, note) for i, note in enumerate(board.notes) if note]
+
+
+tables: dict[tuple, bytes] = {}
+
+
+def table(rule: RuleType, arity: int, base: int = 10) -> bytes:
+    # Flags of the cells the rule marks, for every combination of digits, indexed by the digits in base size + 1
+    if isinstance(rule, partial):
+        key = (rule.func, repr(rule.args), repr(rule.keywords), arity, base)
+    else:
+        key = (rule, "", "", arity, base)
+    if key not in tables:
+        tables[key] = bytes(sum(1 << k for k in rule(list(numbers))) for numbers in product(range(base), repeat=arity))
+    return tables[key]
+
+
+class Constraints:
+    def __init__(self, unit_list: list[Unit], size: int = 9):
+        self.base = size + 1
+        self.groups: list[int] = []
+        self.windows: list[tuple[Indices, bytes]] = []
+        self.lines: list[tuple[Indices, RuleType]] = []
+        for cells, rule in unit_list:
+            if len(cells) <= table_arity:
+                self.windows.append((cells, table(rule, len(cells), self.base)))
+            elif rule is duplicates:
+                self.groups.append(bits(cells))
+            else:
+                self.lines.append((cells, rule))
+
+    def check(self, board: Board) -> set[Point]:
+        values, base = board.values, self.base
+        m = 0
+        for unit in self.groups:
+            m |= board.duplicates(unit)
+        for cells, flags in self.windows:
+            key = 0
+            for i in cells:
+                key = key * base + values[i]
+            if f := flags[key]:
+                for k, i in enumerate(cells):
+                    if f >> k & 1:
+                        m |= 1 << i
+        for cells, rule in self.lines:
+            for k in rule([values[i] for i in cells]):
+                m |= 1 << cells[k]
+        return board.geometry.points(m)
+
+
+def compile_units(board: Board, codes: Iterable[str]) -> Constraints:
+    unit_list = []
+    for code in codes:
+        unit_list += variants[code].units(board)
+    return Constraints(unit_list, board.size)
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+from os import stat
+from queue import SimpleQueue
+from threading import Lock, Thread
+from typing import Iterable
+
+from script.board import Board
+from script.pack import open_level, split_entry
+from script.text import text_cache
+
+Level = tuple[Board, list[str]]
+
+
+def modified(file: str) -> int:
+    source = entry[0] if (entry := split_entry(file)) is not None else file
+    return stat(source).st_mtime_ns
+
+
+class Warmup:
+    # Loads what opening a level needs on a background thread while the level list is already interactive
+    limit = 32
+
+    def __init__(self):
+        self.queue: SimpleQueue[str | None] = SimpleQueue()
+        self.levels: OrderedDict[str, tuple[int, Level]] = OrderedDict()
+        # Held while a level is read, so the worker and the main thread never parse or compile one twice
+        self.lock = Lock()
+        self.thread: Thread | None = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = Thread(target=self.worker, daemon=True)
+            self.thread.start()
+
+    def worker(self):
+        # Font objects must be made on the main thread, but reading the file is most of their cost
+        text_cache.load("D2Coding.ttf")
+        import script.scene.play
+        while (file := self.queue.get()) is not None:
+            with self.lock:
+                if file in self.levels:
+                    continue
+                try:
+                    self.levels[file] = (modified(file), open_level(file))
+                except (OSError, ValueError, IndexError):
+                    continue
+                if len(self.levels) > self.limit:
+                    self.levels.popitem(last=False)
+
+    def submit(self, files: Iterable[str]):
+        # Levels queued before the start are read as soon as the worker runs
+        for file in files:
+            self.queue.put(file)
+
+    def load(self, file: str) -> Level:
+        # A warmed level is handed out once, since Play edits its board
+        with self.lock:
+            entry = self.levels.pop(file, None)
+            if entry is not None and entry[0] == modified(file):
+                return entry[1]
+            return open_level(file)
+
+
+warmup = Warmup()
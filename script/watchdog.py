@@ -0,0 +1,61 @@
+from multiprocessing import Process, Queue
+from multiprocessing.sharedctypes import RawValue
+from queue import Empty
+from time import perf_counter
+
+from script.pack import open_level
+from script.solver import Solver
+
+# A report is the move that was checked and whether the grid after it can still be completed
+Report = tuple[int, bool]
+
+
+def watch(file: str, latest, requests: Queue, reports: Queue, budget: float):
+    # Runs in its own process so the search never competes with rendering for the interpreter lock
+    level, variants = open_level(file)
+    solver = Solver(level, variants)
+    solver.cancelled = lambda: latest.value != move
+    while (request := requests.get()) is not None:
+        move, values = request
+        if move != latest.value:
+            continue
+        solver.givens = values
+        try:
+            solvable = bool(solver.solve(1, perf_counter() + budget))
+        except TimeoutError:
+            continue
+        if move == latest.value:
+            reports.put((move, solvable))
+
+
+class Watchdog:
+    def __init__(self, file: str, budget: float = 2.0):
+        # Number of the newest move; a search for any older move gives up as soon as it changes
+        self.latest = RawValue("q", -1)
+        self.requests: Queue = Queue()
+        self.reports: Queue = Queue()
+        self.process = Process(target=watch, args=(file, self.latest, self.requests, self.reports, budget),
+                               daemon=True)
+        self.process.start()
+
+    def submit(self, move: int, values: bytearray):
+        self.latest.value = move
+        self.requests.put((move, bytes(values)))
+
+    def poll(self) -> Report | None:
+        report = None
+        try:
+            while True:
+                report = self.reports.get_nowait()
+        except Empty:
+            pass
+        if report is not None and report[0] != self.latest.value:
+            return None
+        return report
+
+    def close(self):
+        self.latest.value = -1
+        self.requests.put(None)
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()